@@ -5,53 +5,128 @@ This module converts Git repository data into Graphviz DOT format
 with appropriate visual styling for educational purposes.
 """
 
-from typing import List
+import functools
+import io
+from itertools import chain
+
+from typing import Callable, Iterable, Iterator, List, Optional, Set, TextIO
 
 from .model import (
     Repository, GitCommit, GitTree, GitBlob, GitTag,
-    GitRef, RefType, IndexEntry
+    GitRef, RefType, IndexEntry, ref_node_id, short_ref_name
 )
-from .git_reader import get_head_target_ref, ref_exists
+from .git_reader import get_head_target_ref
 
 
 # Visual styling constants
+_COMMIT_SHAPE = "ellipse"
+_COMMIT_COLOR = "#ffff99"      # Yellow
+_TREE_SHAPE = "folder"
+_TREE_COLOR = "#99ff99"        # Green
+_BLOB_SHAPE = "cylinder"
+_BLOB_COLOR = "#99ccff"        # Blue
+_TAG_SHAPE = "note"
+_TAG_COLOR = "#ffcc99"         # Orange
+_REF_SHAPE = "box"
+_REF_COLOR = "#cccccc"         # Gray
+
+# Styling by object type. Kept for external users; the generators below
+# use the constants above directly.
 COLORS = {
-    "commit": "#ffff99",      # Yellow
-    "tree": "#99ff99",        # Green
-    "blob": "#99ccff",        # Blue
-    "tag": "#ffcc99",         # Orange
-    "ref": "#cccccc",         # Gray
+    "commit": _COMMIT_COLOR,
+    "tree": _TREE_COLOR,
+    "blob": _BLOB_COLOR,
+    "tag": _TAG_COLOR,
+    "ref": _REF_COLOR,
 }
 
 SHAPES = {
-    "commit": "ellipse",
-    "tree": "folder",
-    "blob": "cylinder",
-    "tag": "note",
-    "ref": "box",
+    "commit": _COMMIT_SHAPE,
+    "tree": _TREE_SHAPE,
+    "blob": _BLOB_SHAPE,
+    "tag": _TAG_SHAPE,
+    "ref": _REF_SHAPE,
 }
 
+# Fixed parts of the DOT document
+_DOT_HEADER = (
+    "digraph git_repository {\n"
+    "    // Graph settings\n"
+    "    rankdir=LR;\n"
+    "    node [fontname=\"Helvetica\", fontsize=10];\n"
+    "    edge [fontname=\"Helvetica\", fontsize=9];\n"
+)
+
+_DOT_FOOTER = "}\n"
+
+# Node templates with the per-type styling substituted in at import time.
+# Only the per-object fields remain as %s placeholders.
+_NODE_TMPL = '    "%%s" [label="%s", shape=%s, style=%s, fillcolor="%s"];'
+_COMMIT_NODE_TMPL = _NODE_TMPL % ("%s\\n%s", _COMMIT_SHAPE, "filled", _COMMIT_COLOR)
+_TREE_NODE_TMPL = _NODE_TMPL % ("tree\\n%s", _TREE_SHAPE, "filled", _TREE_COLOR)
+_BLOB_NODE_TMPL = _NODE_TMPL % ("blob\\n%s\\n(%s bytes)", _BLOB_SHAPE, "filled", _BLOB_COLOR)
+_TAG_NODE_TMPL = _NODE_TMPL % ("tag: %s\\n%s", _TAG_SHAPE, "filled", _TAG_COLOR)
+_REF_NODE_TMPL = _NODE_TMPL % ("%s", _REF_SHAPE, '"filled"', _REF_COLOR)
+_HEAD_TARGET_REF_NODE_TMPL = _NODE_TMPL % ("%s", _REF_SHAPE, '"filled,bold"', _REF_COLOR)
+_NONEXISTENT_REF_NODE_TMPL = _NODE_TMPL % ("%s", _REF_SHAPE, '"dashed,bold"', _REF_COLOR)
+_HEAD_NODE = '    "HEAD" [label="HEAD", shape=%s, style="filled,bold", fillcolor="%s"];' % (
+    _REF_SHAPE, _REF_COLOR
+)
 
+# Index table subgraph with a single slot for the table rows
+_INDEX_TABLE_TMPL = "\n".join([
+    "    // Index table",
+    "    subgraph cluster_index {",
+    "        label=\"Git Index\";",
+    "        style=filled;",
+    "        fillcolor=\"#f0f0f0\";",
+    "        node [shape=plaintext];",
+    "        index_table [label=<",
+    "            <TABLE BORDER=\"1\" CELLBORDER=\"1\" CELLSPACING=\"0\" CELLPADDING=\"4\">",
+    "                <TR><TD BGCOLOR=\"#dddddd\"><B>Hash</B></TD><TD BGCOLOR=\"#dddddd\"><B>Path</B></TD></TR>",
+    "%s",
+    "            </TABLE>",
+    "        >];",
+    "    }",
+])
+
+# Translation tables for label escaping. str.translate handles every
+# character in a single pass, so replacements are never re-scanned and
+# backslashes need no special ordering.
+_DOT_ESCAPE = str.maketrans({
+    "\\": "\\\\",
+    '"': '\\"',
+    "\n": "\\n",
+    "\r": "",
+    # Angle brackets for HTML-like labels
+    "<": "&lt;",
+    ">": "&gt;",
+})
+
+_HTML_ESCAPE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+})
+
+
+@functools.lru_cache(maxsize=4096)
 def escape_dot_string(s):
     # type: (str) -> str
     """
     Escape special characters for DOT labels.
     
+    Results are cached, as the same names (file names, branch and tag
+    names) tend to be escaped many times.
+    
     Args:
         s: String to escape.
         
     Returns:
         Escaped string safe for DOT labels.
     """
-    # Escape backslashes first, then quotes
-    s = s.replace("\\", "\\\\")
-    s = s.replace('"', '\\"')
-    s = s.replace("\n", "\\n")
-    s = s.replace("\r", "")
-    # Escape angle brackets for HTML-like labels
-    s = s.replace("<", "&lt;")
-    s = s.replace(">", "&gt;")
-    return s
+    return s.translate(_DOT_ESCAPE)
 
 
 def escape_html_string(s):
@@ -65,11 +140,7 @@ def escape_html_string(s):
     Returns:
         Escaped string safe for HTML labels.
     """
-    s = s.replace("&", "&amp;")
-    s = s.replace("<", "&lt;")
-    s = s.replace(">", "&gt;")
-    s = s.replace('"', "&quot;")
-    return s
+    return s.translate(_HTML_ESCAPE)
 
 
 def generate_header():
@@ -80,15 +151,7 @@ def generate_header():
     Returns:
         DOT header string.
     """
-    lines = [
-        "digraph git_repository {",
-        "    // Graph settings",
-        "    rankdir=LR;",
-        "    node [fontname=\"Helvetica\", fontsize=10];",
-        "    edge [fontname=\"Helvetica\", fontsize=9];",
-        "",
-    ]
-    return "\n".join(lines)
+    return _DOT_HEADER
 
 
 def generate_footer():
@@ -99,7 +162,7 @@ def generate_footer():
     Returns:
         DOT footer string.
     """
-    return "}\n"
+    return _DOT_FOOTER
 
 
 def generate_commit_node(commit):
@@ -113,16 +176,8 @@ def generate_commit_node(commit):
     Returns:
         DOT node definition string.
     """
-    label = "{}\\n{}".format(
-        commit.short_hash,
-        escape_dot_string(commit.message[:30]) if commit.message else ""
-    )
-    return '    "{}" [label="{}", shape={}, style=filled, fillcolor="{}"];'.format(
-        commit.hash,
-        label,
-        SHAPES["commit"],
-        COLORS["commit"]
-    )
+    message = escape_dot_string(commit.message[:30]) if commit.message else ""
+    return _COMMIT_NODE_TMPL % (commit.hash, commit.short_hash, message)
 
 
 def generate_tree_node(tree):
@@ -136,13 +191,7 @@ def generate_tree_node(tree):
     Returns:
         DOT node definition string.
     """
-    label = "tree\\n{}".format(tree.short_hash)
-    return '    "{}" [label="{}", shape={}, style=filled, fillcolor="{}"];'.format(
-        tree.hash,
-        label,
-        SHAPES["tree"],
-        COLORS["tree"]
-    )
+    return _TREE_NODE_TMPL % (tree.hash, tree.short_hash)
 
 
 def generate_blob_node(blob):
@@ -156,13 +205,7 @@ def generate_blob_node(blob):
     Returns:
         DOT node definition string.
     """
-    label = "blob\\n{}\\n({} bytes)".format(blob.short_hash, blob.size)
-    return '    "{}" [label="{}", shape={}, style=filled, fillcolor="{}"];'.format(
-        blob.hash,
-        label,
-        SHAPES["blob"],
-        COLORS["blob"]
-    )
+    return _BLOB_NODE_TMPL % (blob.hash, blob.short_hash, blob.size)
 
 
 def generate_tag_node(tag):
@@ -176,16 +219,7 @@ def generate_tag_node(tag):
     Returns:
         DOT node definition string.
     """
-    label = "tag: {}\\n{}".format(
-        escape_dot_string(tag.name),
-        tag.short_hash
-    )
-    return '    "{}" [label="{}", shape={}, style=filled, fillcolor="{}"];'.format(
-        tag.hash,
-        label,
-        SHAPES["tag"],
-        COLORS["tag"]
-    )
+    return _TAG_NODE_TMPL % (tag.hash, escape_dot_string(tag.name), tag.short_hash)
 
 
 def generate_ref_node(ref, is_head_target=False):
@@ -200,23 +234,9 @@ def generate_ref_node(ref, is_head_target=False):
     Returns:
         DOT node definition string.
     """
-    # Use short name for display
-    label = escape_dot_string(ref.short_name)
-    
-    # Node ID uses the full name to avoid conflicts
-    node_id = "ref_" + ref.name.replace("/", "_").replace(".", "_")
-    
-    style = "filled"
-    if is_head_target:
-        style = "filled,bold"
-    
-    return '    "{}" [label="{}", shape={}, style="{}", fillcolor="{}"];'.format(
-        node_id,
-        label,
-        SHAPES["ref"],
-        style,
-        COLORS["ref"]
-    )
+    # Use short name for display; the node ID uses the full name
+    tmpl = _HEAD_TARGET_REF_NODE_TMPL if is_head_target else _REF_NODE_TMPL
+    return tmpl % (ref.node_id, escape_dot_string(ref.short_name))
 
 
 def generate_nonexistent_ref_node(ref_name):
@@ -234,29 +254,15 @@ def generate_nonexistent_ref_node(ref_name):
         DOT node definition string with dashed style.
     """
     # Extract short name from full ref name
-    prefixes = [
-        "refs/heads/",
-        "refs/remotes/",
-        "refs/tags/",
-    ]
-    short_name = ref_name
-    for prefix in prefixes:
-        if ref_name.startswith(prefix):
-            short_name = ref_name[len(prefix):]
-            break
+    short_name = short_ref_name(ref_name)
     
     label = escape_dot_string(short_name)
     
     # Node ID uses the full name to avoid conflicts
-    node_id = "ref_" + ref_name.replace("/", "_").replace(".", "_")
+    node_id = ref_node_id(ref_name)
     
     # Use dashed style for non-existing references
-    return '    "{}" [label="{}", shape={}, style="dashed,bold", fillcolor="{}"];'.format(
-        node_id,
-        label,
-        SHAPES["ref"],
-        COLORS["ref"]
-    )
+    return _NONEXISTENT_REF_NODE_TMPL % (node_id, label)
 
 
 def generate_head_node(head):
@@ -270,14 +276,11 @@ def generate_head_node(head):
     Returns:
         DOT node definition string.
     """
-    return '    "HEAD" [label="HEAD", shape={}, style="filled,bold", fillcolor="{}"];'.format(
-        SHAPES["ref"],
-        COLORS["ref"]
-    )
+    return _HEAD_NODE
 
 
 def generate_commit_edges(commit, short_mode=False):
-    # type: (GitCommit, bool) -> List[str]
+    # type: (GitCommit, bool) -> Iterator[str]
     """
     Generate edges from a commit to its parents and tree.
     
@@ -285,30 +288,20 @@ def generate_commit_edges(commit, short_mode=False):
         commit: GitCommit object.
         short_mode: If True, skip tree edge (only show parent edges).
         
-    Returns:
-        List of DOT edge definition strings.
+    Yields:
+        DOT edge definition strings.
     """
-    edges = []
-    
     # Edge to tree (skip in short mode)
     if commit.tree_hash and not short_mode:
-        edges.append('    "{}" -> "{}" [color=darkgreen];'.format(
-            commit.hash,
-            commit.tree_hash
-        ))
+        yield f'    "{commit.hash}" -> "{commit.tree_hash}" [color=darkgreen];'
     
     # Edges to parents
     for parent_hash in commit.parent_hashes:
-        edges.append('    "{}" -> "{}" [color=black];'.format(
-            commit.hash,
-            parent_hash
-        ))
-    
-    return edges
+        yield f'    "{commit.hash}" -> "{parent_hash}" [color=black];'
 
 
 def generate_tree_edges(tree):
-    # type: (GitTree) -> List[str]
+    # type: (GitTree) -> Iterator[str]
     """
     Generate edges from a tree to its entries.
     
@@ -316,99 +309,72 @@ def generate_tree_edges(tree):
         tree: GitTree object.
         
     Returns:
-        List of DOT edge definition strings.
+        Iterator over DOT edge definition strings.
     """
-    edges = []
-    
-    for entry in tree.entries:
-        # Add label with entry name
-        edges.append('    "{}" -> "{}" [color=darkgreen, label="{}"];'.format(
-            tree.hash,
-            entry.hash,
-            escape_dot_string(entry.name)
-        ))
-    
-    return edges
+    # Edges are labeled with the entry name
+    tree_hash = tree.hash
+    return (
+        f'    "{tree_hash}" -> "{entry.hash}" [color=darkgreen, label="{escape_dot_string(entry.name)}"];'
+        for entry in tree.entries
+    )
 
 
 def generate_tag_edges(tag):
-    # type: (GitTag) -> List[str]
+    # type: (GitTag) -> Iterator[str]
     """
     Generate edge from a tag to its target.
     
     Args:
         tag: GitTag object.
         
-    Returns:
-        List of DOT edge definition strings.
+    Yields:
+        DOT edge definition strings.
     """
-    edges = []
-    
     if tag.target_hash:
-        edges.append('    "{}" -> "{}" [style=dashed, color=orange];'.format(
-            tag.hash,
-            tag.target_hash
-        ))
-    
-    return edges
+        yield f'    "{tag.hash}" -> "{tag.target_hash}" [style=dashed, color=orange];'
 
 
 def generate_ref_edges(ref):
-    # type: (GitRef) -> List[str]
+    # type: (GitRef) -> Iterator[str]
     """
     Generate edge from a reference to its target.
     
     Args:
         ref: GitRef object.
         
-    Returns:
-        List of DOT edge definition strings.
+    Yields:
+        DOT edge definition strings.
     """
-    edges = []
-    
-    node_id = "ref_" + ref.name.replace("/", "_").replace(".", "_")
-    
     if ref.target_hash:
-        edges.append('    "{}" -> "{}" [style=solid, color=gray];'.format(
-            node_id,
-            ref.target_hash
-        ))
-    
-    return edges
+        yield f'    "{ref.node_id}" -> "{ref.target_hash}" [style=solid, color=gray];'
 
 
-def generate_upstream_edges(refs):
-    # type: (List[GitRef]) -> List[str]
+def generate_upstream_edges(refs, existing_refs=None):
+    # type: (List[GitRef], Optional[Set[str]]) -> Iterator[str]
     """
     Generate edges from local branches to their remote tracking branches.
     
     Args:
         refs: List of GitRef objects.
+        existing_refs: Set of all reference names in refs. Built from refs
+            if not given.
         
-    Returns:
-        List of DOT edge definition strings.
+    Yields:
+        DOT edge definition strings.
     """
-    edges = []
-    
     # Build a set of existing ref names for quick lookup
-    existing_refs = set(ref.name for ref in refs)
+    if existing_refs is None:
+        existing_refs = {ref.name for ref in refs}
     
     for ref in refs:
         if ref.ref_type == RefType.LOCAL_BRANCH and ref.upstream:
             # Check if the upstream ref exists in our refs list
             if ref.upstream in existing_refs:
-                local_node_id = "ref_" + ref.name.replace("/", "_").replace(".", "_")
-                upstream_node_id = "ref_" + ref.upstream.replace("/", "_").replace(".", "_")
-                edges.append('    "{}" -> "{}" [style=dashed, color=gray];'.format(
-                    local_node_id,
-                    upstream_node_id
-                ))
-    
-    return edges
+                yield f'    "{ref.node_id}" -> "{ref.upstream_node_id}" [style=dashed, color=gray];'
 
 
 def generate_head_edges(head, head_target_ref_name):
-    # type: (GitRef, str) -> List[str]
+    # type: (GitRef, str) -> Iterator[str]
     """
     Generate edges from HEAD.
     
@@ -416,24 +382,16 @@ def generate_head_edges(head, head_target_ref_name):
         head: GitRef representing HEAD.
         head_target_ref_name: Name of the ref HEAD points to (or empty if detached).
         
-    Returns:
-        List of DOT edge definition strings.
+    Yields:
+        DOT edge definition strings.
     """
-    edges = []
-    
     if head_target_ref_name:
         # HEAD points to a branch
-        target_node_id = "ref_" + head_target_ref_name.replace("/", "_").replace(".", "_")
-        edges.append('    "HEAD" -> "{}" [style=bold, color=gray];'.format(
-            target_node_id
-        ))
+        target_node_id = ref_node_id(head_target_ref_name)
+        yield f'    "HEAD" -> "{target_node_id}" [style=bold, color=gray];'
     elif head.target_hash:
         # Detached HEAD - points directly to commit
-        edges.append('    "HEAD" -> "{}" [style=dotted, color=gray];'.format(
-            head.target_hash
-        ))
-    
-    return edges
+        yield f'    "HEAD" -> "{head.target_hash}" [style=dotted, color=gray];'
 
 
 def generate_index_table(entries):
@@ -450,31 +408,12 @@ def generate_index_table(entries):
     if not entries:
         return ""
     
-    lines = [
-        "    // Index table",
-        "    subgraph cluster_index {",
-        "        label=\"Git Index\";",
-        "        style=filled;",
-        "        fillcolor=\"#f0f0f0\";",
-        "        node [shape=plaintext];",
-        "        index_table [label=<",
-        "            <TABLE BORDER=\"1\" CELLBORDER=\"1\" CELLSPACING=\"0\" CELLPADDING=\"4\">",
-        "                <TR><TD BGCOLOR=\"#dddddd\"><B>Hash</B></TD><TD BGCOLOR=\"#dddddd\"><B>Path</B></TD></TR>",
-    ]
-    
-    for entry in entries:
-        lines.append('                <TR><TD>{}</TD><TD>{}</TD></TR>'.format(
-            escape_html_string(entry.short_hash),
-            escape_html_string(entry.path)
-        ))
-    
-    lines.extend([
-        "            </TABLE>",
-        "        >];",
-        "    }",
-    ])
-    
-    return "\n".join(lines)
+    rows = "\n".join(
+        f'                <TR><TD>{escape_html_string(entry.short_hash)}</TD>'
+        f'<TD>{escape_html_string(entry.path)}</TD></TR>'
+        for entry in entries
+    )
+    return _INDEX_TABLE_TMPL % rows
 
 
 def generate_rank_constraints(repo, head_target_ref_name, head_target_exists=True, short_mode=False):
@@ -494,36 +433,34 @@ def generate_rank_constraints(repo, head_target_ref_name, head_target_exists=Tru
     parts = []
     
     # Keep all references (branches, tags, HEAD) at the same rank
-    ref_node_ids = []
-    for ref in repo.refs:
-        node_id = "ref_" + ref.name.replace("/", "_").replace(".", "_")
-        ref_node_ids.append('"{}"'.format(node_id))
-    
+    extra_ref_ids = []
     # Include non-existing reference node if HEAD points to unborn branch
     if head_target_ref_name and not head_target_exists:
-        node_id = "ref_" + head_target_ref_name.replace("/", "_").replace(".", "_")
-        ref_node_ids.append('"{}"'.format(node_id))
-    
+        extra_ref_ids.append(f'"{ref_node_id(head_target_ref_name)}"')
     if repo.head:
-        ref_node_ids.append('"HEAD"')
+        extra_ref_ids.append('"HEAD"')
     
-    if ref_node_ids:
+    if repo.refs or extra_ref_ids:
+        ref_ids_str = "; ".join(chain(
+            (f'"{ref.node_id}"' for ref in repo.refs),
+            extra_ref_ids
+        ))
         parts.append("    // Rank constraint: references at same level")
-        parts.append("    {{ rank=same; {} }}".format("; ".join(ref_node_ids)))
+        parts.append(f"    {{ rank=same; {ref_ids_str} }}")
         parts.append("")
     
     # Keep all commits at the same rank
     if repo.commits:
-        commit_ids = ['"{}"'.format(c.hash) for c in repo.commits]
+        commit_ids_str = "; ".join(f'"{c.hash}"' for c in repo.commits)
         parts.append("    // Rank constraint: commits at same level")
-        parts.append("    {{ rank=same; {} }}".format("; ".join(commit_ids)))
+        parts.append(f"    {{ rank=same; {commit_ids_str} }}")
         parts.append("")
     
     # Keep all blobs at the same rank (skip in short mode)
     if repo.blobs and not short_mode:
-        blob_ids = ['"{}"'.format(b.hash) for b in repo.blobs]
+        blob_ids_str = "; ".join(f'"{b.hash}"' for b in repo.blobs)
         parts.append("    // Rank constraint: blobs at same level")
-        parts.append("    {{ rank=same; {} }}".format("; ".join(blob_ids)))
+        parts.append(f"    {{ rank=same; {blob_ids_str} }}")
         parts.append("")
     
     # Note: Trees are NOT constrained to the same rank because they
@@ -532,125 +469,164 @@ def generate_rank_constraints(repo, head_target_ref_name, head_target_exists=Tru
     return parts
 
 
-def generate_dot(repo, include_index=True, repo_path=None, short_mode=False):
-    # type: (Repository, bool, str, bool) -> str
+def _write_lines(write, lines):
+    # type: (Callable[[str], object], Iterable[str]) -> None
     """
-    Generate complete DOT source for a repository.
+    Write strings as newline-terminated lines.
+    
+    The lines are joined in one go so that iteration over large
+    collections runs in C rather than in a Python-level loop.
+    
+    Args:
+        write: Write function of the output stream.
+        lines: Iterable of line strings (without trailing newline).
+    """
+    text = "\n".join(lines)
+    if text:
+        write(text)
+        write("\n")
+
+
+def write_dot(repo, fp, include_index=True, repo_path=None, short_mode=False):
+    # type: (Repository, TextIO, bool, str, bool) -> None
+    """
+    Write complete DOT source for a repository to a text stream.
+    
+    Sections are written as they are generated, so the complete DOT source
+    never has to be held in memory when writing to a file or pipe.
     
     Args:
         repo: Repository object with all data.
+        fp: Writable text stream (file object, io.StringIO, ...).
         include_index: Whether to include the index table.
         repo_path: Path to the repository (for HEAD resolution).
         short_mode: If True, show only references and commits (hide trees, blobs, index).
-        
-    Returns:
-        Complete DOT source string.
     """
-    parts = []
+    write = fp.write
     
     # Header
-    parts.append(generate_header())
+    write(_DOT_HEADER)
+    write("\n")
+    
+    # Names of all references, shared by the checks below
+    existing_refs = {ref.name for ref in repo.refs}
     
     # Determine HEAD target for highlighting
     head_target_ref_name = ""
     head_target_exists = True
     if repo_path:
         head_target_ref_name = get_head_target_ref(repo_path) or ""
-        # Check if the HEAD target reference actually exists
+        # Check if the HEAD target reference actually exists. The refs are
+        # already loaded, so there is no need to ask git again.
         if head_target_ref_name:
-            head_target_exists = ref_exists(repo_path, head_target_ref_name)
+            head_target_exists = head_target_ref_name in existing_refs
     
     # Generate nodes section
-    parts.append("    // Commit nodes")
-    for commit in repo.commits:
-        parts.append(generate_commit_node(commit))
-    parts.append("")
+    write("    // Commit nodes\n")
+    _write_lines(write, map(generate_commit_node, repo.commits))
+    write("\n")
     
     # Tree nodes (skip in short mode)
     if not short_mode:
-        parts.append("    // Tree nodes")
-        for tree in repo.trees:
-            parts.append(generate_tree_node(tree))
-        parts.append("")
+        write("    // Tree nodes\n")
+        _write_lines(write, map(generate_tree_node, repo.trees))
+        write("\n")
     
     # Blob nodes (skip in short mode)
     if not short_mode:
-        parts.append("    // Blob nodes")
-        for blob in repo.blobs:
-            parts.append(generate_blob_node(blob))
-        parts.append("")
+        write("    // Blob nodes\n")
+        _write_lines(write, map(generate_blob_node, repo.blobs))
+        write("\n")
     
     if repo.tags:
-        parts.append("    // Tag object nodes")
-        for tag in repo.tags:
-            parts.append(generate_tag_node(tag))
-        parts.append("")
+        write("    // Tag object nodes\n")
+        _write_lines(write, map(generate_tag_node, repo.tags))
+        write("\n")
     
     # Reference nodes
-    parts.append("    // Reference nodes")
-    for ref in repo.refs:
-        is_head_target = (ref.name == head_target_ref_name)
-        parts.append(generate_ref_node(ref, is_head_target))
+    # Only the reference HEAD points to is highlighted, so locate it once
+    # and emit the references around it with the plain style.
+    write("    // Reference nodes\n")
+    refs = repo.refs
+    if head_target_ref_name in existing_refs:
+        target_index = next(
+            i for i, ref in enumerate(refs) if ref.name == head_target_ref_name
+        )
+        _write_lines(write, map(generate_ref_node, refs[:target_index]))
+        write(generate_ref_node(refs[target_index], True))
+        write("\n")
+        _write_lines(write, map(generate_ref_node, refs[target_index + 1:]))
+    else:
+        _write_lines(write, map(generate_ref_node, refs))
     
     # Non-existing reference node (e.g., unborn branch in empty repo)
     if head_target_ref_name and not head_target_exists:
-        parts.append(generate_nonexistent_ref_node(head_target_ref_name))
+        write(generate_nonexistent_ref_node(head_target_ref_name))
+        write("\n")
     
     # HEAD node
     if repo.head:
-        parts.append(generate_head_node(repo.head))
-    parts.append("")
+        write(generate_head_node(repo.head))
+        write("\n")
+    write("\n")
     
     # Add rank constraints to keep object types at same level
-    rank_constraints = generate_rank_constraints(repo, head_target_ref_name, head_target_exists, short_mode)
-    parts.extend(rank_constraints)
+    _write_lines(write, generate_rank_constraints(repo, head_target_ref_name, head_target_exists, short_mode))
     
     # Generate edges section
-    parts.append("    // Commit edges")
-    for commit in repo.commits:
-        edges = generate_commit_edges(commit, short_mode)
-        parts.extend(edges)
-    parts.append("")
+    write("    // Commit edges\n")
+    commit_edges = functools.partial(generate_commit_edges, short_mode=short_mode)
+    _write_lines(write, chain.from_iterable(map(commit_edges, repo.commits)))
+    write("\n")
     
     # Tree edges (skip in short mode)
     if not short_mode:
-        parts.append("    // Tree edges")
-        for tree in repo.trees:
-            edges = generate_tree_edges(tree)
-            parts.extend(edges)
-        parts.append("")
+        write("    // Tree edges\n")
+        _write_lines(write, chain.from_iterable(map(generate_tree_edges, repo.trees)))
+        write("\n")
     
     if repo.tags:
-        parts.append("    // Tag edges")
-        for tag in repo.tags:
-            edges = generate_tag_edges(tag)
-            parts.extend(edges)
-        parts.append("")
+        write("    // Tag edges\n")
+        _write_lines(write, chain.from_iterable(map(generate_tag_edges, repo.tags)))
+        write("\n")
     
-    parts.append("    // Reference edges")
-    for ref in repo.refs:
-        edges = generate_ref_edges(ref)
-        parts.extend(edges)
+    write("    // Reference edges\n")
+    _write_lines(write, chain.from_iterable(map(generate_ref_edges, repo.refs)))
     
     # Upstream tracking edges (local branch -> remote tracking branch)
-    upstream_edges = generate_upstream_edges(repo.refs)
+    upstream_edges = list(generate_upstream_edges(repo.refs, existing_refs))
     if upstream_edges:
-        parts.append("")
-        parts.append("    // Upstream tracking edges")
-        parts.extend(upstream_edges)
+        write("\n    // Upstream tracking edges\n")
+        _write_lines(write, upstream_edges)
     
     # HEAD edges
     if repo.head:
-        edges = generate_head_edges(repo.head, head_target_ref_name)
-        parts.extend(edges)
-    parts.append("")
+        _write_lines(write, generate_head_edges(repo.head, head_target_ref_name))
+    write("\n")
     
     # Index table (skip in short mode)
     if include_index and repo.index_entries and not short_mode:
-        parts.append(generate_index_table(repo.index_entries))
-        parts.append("")
+        write(generate_index_table(repo.index_entries))
+        write("\n\n")
     
     # Footer
-    parts.append(generate_footer())
+    write(_DOT_FOOTER)
+
+
+def generate_dot(repo, include_index=True, repo_path=None, short_mode=False):
+    # type: (Repository, bool, str, bool) -> str
+    """
+    Generate complete DOT source for a repository.
     
-    return "\n".join(parts)
+    Args:
+        repo: Repository object with all data.
+        include_index: Whether to include the index table.
+        repo_path: Path to the repository (for HEAD resolution).
+        short_mode: If True, show only references and commits (hide trees, blobs, index).
+        
+    Returns:
+        Complete DOT source string.
+    """
+    buf = io.StringIO()
+    write_dot(repo, buf, include_index, repo_path, short_mode)
+    return buf.getvalue()
@@ -4,13 +4,60 @@ Git repository data reader.
 This module provides functions to read Git repository data using the git CLI.
 """
 
-from typing import List, Optional, Tuple
+import functools
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
 
 from .model import (
     Repository, GitCommit, GitTree, GitBlob, GitTag,
     GitRef, RefType, IndexEntry, TreeEntry
 )
-from .utils import run_command, CommandError, is_bare_repository
+from .utils import (
+    run_command, CommandError, GitCatFileSession, is_bare_repository,
+    parse_cat_file_header
+)
+
+
+# Reference type by namespace below refs/; others default to a local branch
+_REF_KINDS = {
+    "heads": RefType.LOCAL_BRANCH,
+    "remotes": RefType.REMOTE_BRANCH,
+    "tags": RefType.TAG,
+}
+
+# Object type of a tree entry, derived from its mode
+_TREE_MODE_TYPES = {
+    "040000": "tree",
+    "160000": "commit",  # Submodule
+}
+
+# (mode, object type) by raw mode as stored in tree objects. Trees use only
+# a handful of modes, so every entry shares the same few strings.
+_TREE_MODES = {}  # type: Dict[bytes, Tuple[str, str]]
+
+
+def _tree_mode(raw_mode):
+    # type: (bytes) -> Tuple[str, str]
+    """
+    Get the normalized mode and object type for a raw tree entry mode.
+    
+    Args:
+        raw_mode: Mode as stored in the tree object (e.g. b"40000").
+        
+    Returns:
+        Tuple of (six digit mode, object type).
+    """
+    result = _TREE_MODES.get(raw_mode)
+    if result is None:
+        # Modes are stored without leading zeros (e.g. "40000")
+        mode = raw_mode.decode("ascii").zfill(6)
+        result = _TREE_MODES[raw_mode] = (mode, _TREE_MODE_TYPES.get(mode, "blob"))
+    return result
 
 
 def list_all_objects(repo_path):
@@ -29,126 +76,531 @@ def list_all_objects(repo_path):
     returncode, stdout, stderr = run_command(
         ["git", "cat-file", "--batch-check", "--batch-all-objects"],
         cwd=repo_path,
-        check=True
+        check=True,
+        binary=True
     )
     
     objects = []
-    for line in stdout.strip().split("\n"):
-        if not line:
-            continue
-        parts = line.split()
-        if len(parts) >= 3:
-            obj_hash = parts[0]
-            obj_type = parts[1]
-            obj_size = int(parts[2])
-            objects.append((obj_hash, obj_type, obj_size))
+    for line in stdout.splitlines():
+        # Format: <hash> <type> <size>
+        parts = line.split(b" ", 2)
+        if len(parts) == 3:
+            obj_hash, obj_type, obj_size = parts
+            objects.append((
+                obj_hash.decode("ascii"),
+                obj_type.decode("ascii"),
+                int(obj_size)
+            ))
     
     return objects
 
 
-def read_commit(repo_path, commit_hash):
-    # type: (str, str) -> GitCommit
+def _iter_cat_file_batch(repo_path, options, hashes=None, skip_types=()):
+    # type: (str, List[str], Optional[Iterable[str]], Iterable[str]) -> Iterator[Tuple[str, str, int, bytes]]
     """
-    Read commit object details.
+    Run git cat-file in batch mode and parse its output stream.
+    
+    If hashes are given, they are fed to git from a background thread while
+    the output is consumed, so neither side can block on a full pipe.
+    
+    Args:
+        repo_path: Path to the Git repository.
+        options: Options for git cat-file (must include --batch).
+        hashes: Hashes of the objects to read, or None if the options
+            select the objects (e.g. --batch-all-objects).
+        skip_types: Object types whose content is discarded while reading.
+        
+    Yields:
+        Tuples: (hash, type, size, raw_content). raw_content is empty for
+        skipped types.
+        
+    Raises:
+        CommandError: If git cannot be started, fails, or an object is missing.
+    """
+    args = ["git", "cat-file"] + options
+    command = " ".join(args)
+    try:
+        process = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE if hashes is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=repo_path
+        )
+    except OSError as e:
+        raise CommandError(command, -1, str(e))
+    
+    stderr_output = []  # type: List[bytes]
+    
+    def feed():
+        # type: () -> None
+        if hashes is not None:
+            try:
+                for obj_hash in hashes:
+                    process.stdin.write(obj_hash.encode("utf-8") + b"\n")
+                process.stdin.close()
+            except (OSError, ValueError):
+                # git exited early; the error is reported by the reader
+                pass
+        stderr_output.append(process.stderr.read())
+    
+    writer = threading.Thread(target=feed)
+    writer.daemon = True
+    writer.start()
+    
+    skip_types = frozenset(skip_types)
+    
+    completed = False
+    try:
+        stdout = process.stdout
+        while True:
+            header = stdout.readline()
+            if not header:
+                break
+            obj_hash, obj_type, size = parse_cat_file_header(command, header)
+            # Content is followed by a newline
+            if obj_type in skip_types:
+                remaining = size + 1
+                while remaining > 0:
+                    chunk = stdout.read(min(remaining, 65536))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                content = b""
+            else:
+                content = stdout.read(size + 1)[:-1]
+            yield obj_hash, obj_type, size, content
+        completed = True
+    finally:
+        if not completed:
+            process.kill()
+        process.stdout.close()
+        writer.join()
+        process.wait()
+    
+    if process.returncode != 0:
+        stderr = b"".join(stderr_output).decode("utf-8", "replace")
+        raise CommandError(command, process.returncode, stderr)
+
+
+def stream_objects(repo_path, hashes):
+    # type: (str, Iterable[str]) -> Iterator[Tuple[str, str, bytes]]
+    """
+    Read the raw contents of many objects through a single git process.
+    
+    Uses: git cat-file --batch --buffer
+    
+    Args:
+        repo_path: Path to the Git repository.
+        hashes: Hashes of the objects to read.
+        
+    Yields:
+        Tuples: (hash, type, raw_content), in the order of the hashes.
+        
+    Raises:
+        CommandError: If git fails or an object is missing.
+    """
+    for obj_hash, obj_type, size, content in _iter_cat_file_batch(
+            repo_path, ["--batch", "--buffer"], hashes):
+        yield obj_hash, obj_type, content
+
+
+def iter_all_objects_with_contents(repo_path, skip_content_types=()):
+    # type: (str, Iterable[str]) -> Iterator[Tuple[str, str, int, bytes]]
+    """
+    Read all objects in the repository, including their contents, in one pass.
+    
+    Uses: git cat-file --batch-all-objects --batch --unordered --buffer
     
-    Uses: git cat-file -p <hash>
+    Objects are returned in pack order rather than sorted by hash, which
+    lets git read them with much better locality.
+    
+    Args:
+        repo_path: Path to the Git repository.
+        skip_content_types: Object types whose content is not needed
+            (e.g. "blob"). Their content is returned as empty bytes.
+        
+    Yields:
+        Tuples: (hash, type, size, raw_content).
+        
+    Raises:
+        CommandError: If git fails.
+    """
+    return _iter_cat_file_batch(
+        repo_path,
+        ["--batch-all-objects", "--batch", "--unordered", "--buffer"],
+        skip_types=skip_content_types
+    )
+
+
+def _read_object(repo_path, name):
+    # type: (str, str) -> Tuple[str, bytes]
+    """
+    Read the raw content of a single object.
     
     Args:
         repo_path: Path to the Git repository.
+        name: Hash (possibly abbreviated) or other name of the object.
+        
+    Returns:
+        Tuple of (full hash as reported by git, raw content).
+    """
+    objects = list(stream_objects(repo_path, [name]))
+    obj_hash, obj_type, content = objects[0]
+    return obj_hash, content
+
+
+class CatFileServer(object):
+    """
+    Cached object reader on top of a GitCatFileSession.
+    
+    Reading many objects costs a single git process, and recently read
+    objects are served from a cache. Lookups are serialized by the session,
+    so an instance can be shared between threads, but each thread can also
+    use its own instance to read in parallel.
+    
+    Usage:
+        with CatFileServer(repo_path) as server:
+            content = server.get(obj_hash)
+    """
+    
+    def __init__(self, repo_path, cache_size=4096):
+        # type: (str, int) -> None
+        """
+        Start the git process.
+        
+        Args:
+            repo_path: Path to the Git repository.
+            cache_size: Number of object contents to keep cached.
+            
+        Raises:
+            CommandError: If git cannot be started.
+        """
+        self._session = GitCatFileSession(repo_path)
+        self.get = functools.lru_cache(maxsize=cache_size)(self._read)
+    
+    def _read(self, obj_hash):
+        # type: (str) -> bytes
+        """
+        Read the raw content of an object.
+        
+        Args:
+            obj_hash: Hash of the object.
+            
+        Returns:
+            Raw object content.
+            
+        Raises:
+            CommandError: If the object is missing or git has exited.
+        """
+        return self._session.read(obj_hash)[2]
+    
+    def close(self):
+        # type: () -> None
+        """Stop the git process."""
+        self._session.close()
+    
+    def __enter__(self):
+        # type: () -> CatFileServer
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        # type: (object, object, object) -> None
+        self.close()
+
+
+def _worker_count():
+    # type: () -> int
+    """
+    Get the number of threads to use for per-object reads.
+    
+    Can be overridden with the GIT_DATA_GRAPH_THREADS environment variable.
+    
+    Returns:
+        Number of worker threads.
+    """
+    try:
+        workers = int(os.environ.get("GIT_DATA_GRAPH_THREADS", ""))
+    except ValueError:
+        workers = 0
+    return workers if workers > 0 else (os.cpu_count() or 4)
+
+
+def _iter_objects_individually(repo_path, skip_content_types=()):
+    # type: (str, Iterable[str]) -> Iterator[Tuple[str, str, int, bytes]]
+    """
+    Read all objects in the repository through per-thread cat-file sessions.
+    
+    Fallback for git versions that cannot stream all object contents in one
+    pass. The objects are requested one by one from a thread pool; each
+    worker thread keeps its own persistent CatFileServer, so there is one
+    git process per thread rather than per object.
+    
+    Args:
+        repo_path: Path to the Git repository.
+        skip_content_types: Object types whose content is not needed.
+            Their content is returned as empty bytes.
+        
+    Yields:
+        Tuples: (hash, type, size, raw_content).
+    """
+    objects = list_all_objects(repo_path)
+    servers = []  # type: List[CatFileServer]
+    local = threading.local()
+    
+    def read(obj):
+        obj_hash, obj_type, obj_size = obj
+        if obj_type in skip_content_types:
+            return b""
+        server = getattr(local, "server", None)
+        if server is None:
+            server = local.server = CatFileServer(repo_path, cache_size=0)
+            servers.append(server)
+        return server.get(obj_hash)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=_worker_count()) as executor:
+            for (obj_hash, obj_type, obj_size), content in zip(
+                    objects, executor.map(read, objects)):
+                yield obj_hash, obj_type, obj_size, content
+    finally:
+        for server in servers:
+            server.close()
+
+
+def _decode(data):
+    # type: (bytes) -> str
+    """Decode text from a Git object, tolerating invalid UTF-8."""
+    return data.decode("utf-8", "replace")
+
+
+def _parse_identity(value):
+    # type: (bytes) -> str
+    """
+    Extract the name from an author/tagger header value.
+    
+    Args:
+        value: Header value in the form "Name <email> timestamp timezone".
+        
+    Returns:
+        The name part.
+    """
+    name, sep, _ = value.partition(b" <")
+    if not sep:
+        # No email part; fall back to the first word
+        words = value.split(None, 1)
+        name = words[0] if words else b""
+    return _decode(name)
+
+
+def _first_body_line(body):
+    # type: (bytes) -> str
+    """
+    Extract the first non-blank line of an object message.
+    
+    Only the summary line is displayed, so the rest of the (possibly long)
+    message is never split or copied.
+    
+    Args:
+        body: Raw message part of a commit or tag object.
+        
+    Returns:
+        Stripped first line of the message.
+    """
+    start = 0
+    end = body.find(b"\n")
+    # Skip leading blank lines
+    while end != -1 and not body[start:end].strip():
+        start = end + 1
+        end = body.find(b"\n", start)
+    
+    return _decode(body[start:end].strip() if end != -1 else body[start:].strip())
+
+
+def _decode_stripped(value):
+    # type: (bytes) -> str
+    """Decode a header value, dropping surrounding whitespace."""
+    return _decode(value.strip())
+
+
+def _set_field(name, parse):
+    # type: (str, Callable[[bytes], str]) -> Callable[[Dict[str, Any], bytes], None]
+    """Create a header handler that stores the parsed value in a field."""
+    def handler(fields, value):
+        fields[name] = parse(value)
+    return handler
+
+
+def _append_parent(fields, value):
+    # type: (Dict[str, Any], bytes) -> None
+    """Header handler collecting the parents of a commit."""
+    fields["parent_hashes"].append(_decode_stripped(value))
+
+
+# Header handlers keyed by header name. Headers without a handler
+# (encoding, gpgsig, mergetag, signature continuation lines) are ignored.
+_COMMIT_HEADERS = {
+    b"tree": _set_field("tree_hash", _decode_stripped),
+    b"parent": _append_parent,
+    # author Name <email> timestamp timezone
+    b"author": _set_field("author", _parse_identity),
+}
+
+_TAG_HEADERS = {
+    b"object": _set_field("target_hash", _decode_stripped),
+    b"tag": _set_field("name", _decode_stripped),
+    b"tagger": _set_field("tagger", _parse_identity),
+}
+
+
+def _parse_headers(headers, handlers, fields):
+    # type: (bytes, Dict[bytes, Callable[[Dict[str, Any], bytes], None]], Dict[str, Any]) -> None
+    """
+    Parse the header block of a commit or tag object.
+    
+    Args:
+        headers: Raw header lines of the object.
+        handlers: Handlers keyed by header name.
+        fields: Field values, updated in place by the handlers.
+    """
+    for line in headers.split(b"\n"):
+        key, _, value = line.partition(b" ")
+        handler = handlers.get(key)
+        if handler is not None:
+            handler(fields, value)
+
+
+def _parse_commit_payload(commit_hash, payload):
+    # type: (str, bytes) -> GitCommit
+    """
+    Parse raw commit object content.
+    
+    Args:
         commit_hash: Hash of the commit object.
+        payload: Raw content of the commit object.
         
     Returns:
         GitCommit object.
     """
-    returncode, stdout, stderr = run_command(
-        ["git", "cat-file", "-p", commit_hash],
-        cwd=repo_path,
-        check=True
-    )
+    # Headers are separated from the message by the first empty line
+    headers, _, body = payload.partition(b"\n\n")
     
-    tree_hash = ""
-    parent_hashes = []
-    author = ""
-    message = ""
-    
-    lines = stdout.split("\n")
-    in_message = False
-    message_lines = []
-    
-    for line in lines:
-        if in_message:
-            message_lines.append(line)
-        elif line == "":
-            in_message = True
-        elif line.startswith("tree "):
-            tree_hash = line[5:].strip()
-        elif line.startswith("parent "):
-            parent_hashes.append(line[7:].strip())
-        elif line.startswith("author "):
-            # Parse author line: author Name <email> timestamp timezone
-            author_part = line[7:]
-            # Extract just the name and email
-            if " <" in author_part:
-                author = author_part.split(" <")[0]
-            else:
-                author = author_part.split()[0] if author_part else ""
-    
-    message = "\n".join(message_lines).strip()
-    # Get just the first line of the message
-    first_line = message.split("\n")[0] if message else ""
+    fields = {"tree_hash": "", "parent_hashes": [], "author": ""}
+    _parse_headers(headers, _COMMIT_HEADERS, fields)
     
     return GitCommit(
         hash_value=commit_hash,
-        tree_hash=tree_hash,
-        parent_hashes=parent_hashes,
-        message=first_line,
-        author=author
+        message=_first_body_line(body),
+        **fields
     )
 
 
-def read_tree(repo_path, tree_hash):
-    # type: (str, str) -> GitTree
+def _parse_tree_payload(tree_hash, payload):
+    # type: (str, bytes) -> GitTree
     """
-    Read tree object details.
+    Parse raw tree object content.
     
-    Uses: git cat-file -p <hash>
+    The raw format is a sequence of "<mode> <name>\\0<binary hash>" records.
     
     Args:
-        repo_path: Path to the Git repository.
         tree_hash: Hash of the tree object.
+        payload: Raw content of the tree object.
         
     Returns:
         GitTree object with entries.
     """
-    returncode, stdout, stderr = run_command(
-        ["git", "cat-file", "-p", tree_hash],
-        cwd=repo_path,
-        check=True
-    )
+    # Binary hash length matches the hex hash length of the tree itself
+    # (20 bytes for SHA-1, 32 bytes for SHA-256 repositories)
+    hash_len = len(tree_hash) // 2
     
     entries = []
-    for line in stdout.strip().split("\n"):
-        if not line:
-            continue
-        # Format: <mode> <type> <hash>\t<name>
-        parts = line.split("\t", 1)
-        if len(parts) == 2:
-            meta = parts[0].split()
-            name = parts[1]
-            if len(meta) >= 3:
-                mode = meta[0]
-                obj_type = meta[1]
-                obj_hash = meta[2]
-                entries.append(TreeEntry(
-                    mode=mode,
-                    obj_type=obj_type,
-                    hash_value=obj_hash,
-                    name=name
-                ))
+    pos = 0
+    end = len(payload)
+    while pos < end:
+        space = payload.index(b" ", pos)
+        nul = payload.index(b"\0", space)
+        mode, obj_type = _tree_mode(payload[pos:space])
+        name = _decode(payload[space + 1:nul])
+        pos = nul + 1 + hash_len
+        entries.append(TreeEntry(
+            mode=mode,
+            obj_type=obj_type,
+            hash_value=payload[nul + 1:pos].hex(),
+            name=name
+        ))
     
     return GitTree(hash_value=tree_hash, entries=entries)
 
 
+def _parse_tag_payload(tag_hash, payload):
+    # type: (str, bytes) -> GitTag
+    """
+    Parse raw annotated tag object content.
+    
+    Args:
+        tag_hash: Hash of the tag object.
+        payload: Raw content of the tag object.
+        
+    Returns:
+        GitTag object.
+    """
+    # Headers are separated from the message by the first empty line
+    headers, _, body = payload.partition(b"\n\n")
+    
+    fields = {"target_hash": "", "name": "", "tagger": ""}
+    _parse_headers(headers, _TAG_HEADERS, fields)
+    
+    return GitTag(
+        hash_value=tag_hash,
+        message=_first_body_line(body),
+        **fields
+    )
+
+
+# Payload parsers of the object types whose content is read
+_PAYLOAD_PARSERS = {
+    "commit": _parse_commit_payload,
+    "tree": _parse_tree_payload,
+    "tag": _parse_tag_payload,
+}
+
+
+def read_commit(repo_path, commit_hash):
+    # type: (str, str) -> GitCommit
+    """
+    Read commit object details.
+    
+    Uses: git cat-file --batch
+    
+    Args:
+        repo_path: Path to the Git repository.
+        commit_hash: Hash (possibly abbreviated) or other name of the
+            commit object.
+        
+    Returns:
+        GitCommit object.
+    """
+    return _parse_commit_payload(*_read_object(repo_path, commit_hash))
+
+
+def read_tree(repo_path, tree_hash):
+    # type: (str, str) -> GitTree
+    """
+    Read tree object details.
+    
+    Uses: git cat-file --batch
+    
+    Args:
+        repo_path: Path to the Git repository.
+        tree_hash: Hash (possibly abbreviated) or other name of the
+            tree object.
+        
+    Returns:
+        GitTree object with entries.
+    """
+    return _parse_tree_payload(*_read_object(repo_path, tree_hash))
+
+
 def read_blob_metadata(repo_path, blob_hash, size):
     # type: (str, str, int) -> GitBlob
     """
@@ -172,56 +624,17 @@ def read_tag(repo_path, tag_hash):
     """
     Read annotated tag object details.
     
-    Uses: git cat-file -p <hash>
+    Uses: git cat-file --batch
     
     Args:
         repo_path: Path to the Git repository.
-        tag_hash: Hash of the tag object.
+        tag_hash: Hash (possibly abbreviated) or other name of the
+            tag object.
         
     Returns:
         GitTag object.
     """
-    returncode, stdout, stderr = run_command(
-        ["git", "cat-file", "-p", tag_hash],
-        cwd=repo_path,
-        check=True
-    )
-    
-    target_hash = ""
-    tag_name = ""
-    tagger = ""
-    message = ""
-    
-    lines = stdout.split("\n")
-    in_message = False
-    message_lines = []
-    
-    for line in lines:
-        if in_message:
-            message_lines.append(line)
-        elif line == "":
-            in_message = True
-        elif line.startswith("object "):
-            target_hash = line[7:].strip()
-        elif line.startswith("tag "):
-            tag_name = line[4:].strip()
-        elif line.startswith("tagger "):
-            tagger_part = line[7:]
-            if " <" in tagger_part:
-                tagger = tagger_part.split(" <")[0]
-            else:
-                tagger = tagger_part.split()[0] if tagger_part else ""
-    
-    message = "\n".join(message_lines).strip()
-    first_line = message.split("\n")[0] if message else ""
-    
-    return GitTag(
-        hash_value=tag_hash,
-        target_hash=target_hash,
-        name=tag_name,
-        message=first_line,
-        tagger=tagger
-    )
+    return _parse_tag_payload(*_read_object(repo_path, tag_hash))
 
 
 def list_references(repo_path):
@@ -229,7 +642,7 @@ def list_references(repo_path):
     """
     List all references in the repository.
     
-    Uses: git for-each-ref --format='%(refname) %(objectname) %(upstream)'
+    Uses: git for-each-ref --format='%(refname)%00%(objectname)%00%(upstream)'
     
     Args:
         repo_path: Path to the Git repository.
@@ -237,39 +650,32 @@ def list_references(repo_path):
     Returns:
         List of GitRef objects.
     """
-    # Use a delimiter to handle empty upstream values
-    delimiter = "|||"
+    # Separate fields with NUL, which cannot occur in any of them. The
+    # upstream field is empty for refs without an upstream.
     returncode, stdout, stderr = run_command(
-        ["git", "for-each-ref", "--format=%(refname)" + delimiter + "%(objectname)" + delimiter + "%(upstream)"],
+        ["git", "for-each-ref", "--format=%(refname)%00%(objectname)%00%(upstream)"],
         cwd=repo_path,
-        check=True
+        check=True,
+        binary=True
     )
     
     refs = []
-    for line in stdout.strip().split("\n"):
-        if not line:
-            continue
-        parts = line.split(delimiter)
-        if len(parts) >= 2:
-            ref_name = parts[0]
-            target_hash = parts[1]
-            upstream = parts[2] if len(parts) >= 3 and parts[2] else None
+    for line in stdout.splitlines():
+        parts = line.split(b"\x00", 2)
+        if len(parts) == 3:
+            ref_name = _decode(parts[0])
+            target_hash = parts[1].decode("ascii")
+            upstream = _decode(parts[2]) or None
+            
+            # Determine ref type from the namespace (refs/<kind>/...)
+            kind = ref_name.split("/", 2)[1] if ref_name.startswith("refs/") else ""
+            ref_type = _REF_KINDS.get(kind, RefType.LOCAL_BRANCH)
             
             # Skip remote HEAD references (e.g., refs/remotes/origin/HEAD)
             # These are not relevant for visualization
-            if ref_name.startswith("refs/remotes/") and ref_name.endswith("/HEAD"):
+            if ref_type == RefType.REMOTE_BRANCH and ref_name.endswith("/HEAD"):
                 continue
             
-            # Determine ref type
-            if ref_name.startswith("refs/heads/"):
-                ref_type = RefType.LOCAL_BRANCH
-            elif ref_name.startswith("refs/remotes/"):
-                ref_type = RefType.REMOTE_BRANCH
-            elif ref_name.startswith("refs/tags/"):
-                ref_type = RefType.TAG
-            else:
-                ref_type = RefType.LOCAL_BRANCH  # Default
-            
             refs.append(GitRef(
                 name=ref_name,
                 target_hash=target_hash,
@@ -285,7 +691,7 @@ def resolve_head(repo_path):
     """
     Resolve HEAD to determine what it points to.
     
-    Uses: git symbolic-ref HEAD (or git rev-parse HEAD for detached)
+    Uses: git rev-parse --verify HEAD (and git symbolic-ref HEAD for unborn branches)
     
     Args:
         repo_path: Path to the Git repository.
@@ -293,49 +699,55 @@ def resolve_head(repo_path):
     Returns:
         GitRef representing HEAD, or None if HEAD doesn't exist.
     """
-    # Try to get symbolic reference first
     try:
+        # Get the hash that HEAD ultimately points to. This covers both a
+        # HEAD pointing to a branch and a detached HEAD.
         returncode, stdout, stderr = run_command(
-            ["git", "symbolic-ref", "HEAD"],
+            ["git", "rev-parse", "--verify", "--quiet", "HEAD"],
             cwd=repo_path,
             check=False
         )
-        
         if returncode == 0:
-            # HEAD points to a branch
-            ref_name = stdout.strip()
-            # Get the hash that HEAD ultimately points to
-            ret2, hash_out, err2 = run_command(
-                ["git", "rev-parse", "HEAD"],
-                cwd=repo_path,
-                check=False
-            )
-            target_hash = hash_out.strip() if ret2 == 0 else ""
-            
             return GitRef(
                 name="HEAD",
-                target_hash=target_hash,
+                target_hash=stdout.strip(),
                 ref_type=RefType.HEAD
             )
-        else:
-            # Detached HEAD state
-            ret2, hash_out, err2 = run_command(
-                ["git", "rev-parse", "HEAD"],
-                cwd=repo_path,
-                check=False
+        
+        # HEAD may point to a branch that does not exist yet (unborn branch)
+        returncode, stdout, stderr = run_command(
+            ["git", "symbolic-ref", "HEAD"],
+            cwd=repo_path,
+            check=False
+        )
+        if returncode == 0:
+            return GitRef(
+                name="HEAD",
+                target_hash="",
+                ref_type=RefType.HEAD
             )
-            if ret2 == 0:
-                return GitRef(
-                    name="HEAD",
-                    target_hash=hash_out.strip(),
-                    ref_type=RefType.HEAD
-                )
     except CommandError:
         pass
     
     return None
 
 
+def _resolve_head_unless_bare(repo_path):
+    # type: (str) -> Optional[GitRef]
+    """
+    Resolve HEAD, skipping bare repositories as HEAD is not interesting there.
+    
+    Args:
+        repo_path: Path to the Git repository.
+        
+    Returns:
+        GitRef representing HEAD, or None if bare or HEAD doesn't exist.
+    """
+    if is_bare_repository(repo_path):
+        return None
+    return resolve_head(repo_path)
+
+
 def get_head_target_ref(repo_path):
     # type: (str) -> Optional[str]
     """
@@ -360,27 +772,48 @@ def get_head_target_ref(repo_path):
     return None
 
 
-def ref_exists(repo_path, ref_name):
-    # type: (str, str) -> bool
+@functools.lru_cache(maxsize=8)
+def ref_names_set(repo_path):
+    # type: (str) -> FrozenSet[str]
     """
-    Check if a reference exists in the repository.
+    Get the names of all references in the repository.
+    
+    The result is cached per repository path, as the repository is only
+    read while the tool runs.
     
     Args:
         repo_path: Path to the Git repository.
-        ref_name: Full reference name (e.g., "refs/heads/main").
         
     Returns:
-        True if the reference exists, False otherwise.
+        Set of full reference names.
     """
     try:
         returncode, stdout, stderr = run_command(
-            ["git", "show-ref", "--verify", "--quiet", ref_name],
+            ["git", "for-each-ref", "--format=%(refname)"],
             cwd=repo_path,
-            check=False
+            check=False,
+            binary=True
         )
-        return returncode == 0
     except CommandError:
-        return False
+        return frozenset()
+    if returncode != 0:
+        return frozenset()
+    return frozenset(_decode(line) for line in stdout.splitlines())
+
+
+def ref_exists(repo_path, ref_name):
+    # type: (str, str) -> bool
+    """
+    Check if a reference exists in the repository.
+    
+    Args:
+        repo_path: Path to the Git repository.
+        ref_name: Full reference name (e.g., "refs/heads/main").
+        
+    Returns:
+        True if the reference exists, False otherwise.
+    """
+    return ref_name in ref_names_set(repo_path)
 
 
 def read_index_entries(repo_path):
@@ -388,7 +821,10 @@ def read_index_entries(repo_path):
     """
     Read index (staging area) entries.
     
-    Uses: git ls-files --stage
+    Uses: git ls-files --stage -z
+    
+    Paths are read unquoted (NUL-terminated records), so they match the
+    names in the tree objects.
     
     Args:
         repo_path: Path to the Git repository.
@@ -398,32 +834,30 @@ def read_index_entries(repo_path):
     """
     try:
         returncode, stdout, stderr = run_command(
-            ["git", "ls-files", "--stage"],
+            ["git", "ls-files", "--stage", "-z"],
             cwd=repo_path,
-            check=False
+            check=False,
+            binary=True
         )
         
         if returncode != 0:
             return []
         
         entries = []
-        for line in stdout.strip().split("\n"):
-            if not line:
-                continue
+        for record in stdout.split(b"\0"):
             # Format: <mode> <hash> <stage>\t<path>
-            parts = line.split("\t", 1)
-            if len(parts) == 2:
-                meta = parts[0].split()
-                path = parts[1]
-                if len(meta) >= 3:
-                    # mode = meta[0]  # Not used currently
-                    obj_hash = meta[1]
-                    stage = int(meta[2])
-                    entries.append(IndexEntry(
-                        hash_value=obj_hash,
-                        path=path,
-                        stage=stage
-                    ))
+            meta, sep, path = record.partition(b"\t")
+            if not sep:
+                continue
+            meta_parts = meta.split(b" ", 2)
+            if len(meta_parts) == 3:
+                # The mode is not used currently
+                mode, obj_hash, stage = meta_parts
+                entries.append(IndexEntry(
+                    hash_value=obj_hash.decode("ascii"),
+                    path=_decode(path),
+                    stage=int(stage)
+                ))
         
         return entries
     except CommandError:
@@ -440,9 +874,89 @@ def count_objects(repo_path):
         
     Returns:
         Number of objects.
+        
+    Raises:
+        CommandError: If git cannot be started or fails.
     """
-    objects = list_all_objects(repo_path)
-    return len(objects)
+    # An empty format prints one empty line per object; count the newlines
+    # in chunks instead of parsing lines
+    command = ["git", "cat-file", "--batch-all-objects", "--batch-check="]
+    try:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=repo_path
+        )
+    except OSError as e:
+        raise CommandError(" ".join(command), -1, str(e))
+    
+    total = 0
+    with process:
+        for chunk in iter(lambda: process.stdout.read(65536), b""):
+            total += chunk.count(b"\n")
+        stderr = process.stderr.read()
+    
+    if process.returncode != 0:
+        raise CommandError(
+            " ".join(command), process.returncode, stderr.decode("utf-8", "replace")
+        )
+    
+    return total
+
+
+def _parse_objects(repo_path, objects):
+    # type: (str, Iterable[Tuple[str, str, int, bytes]]) -> Tuple[Dict[str, list], List[GitBlob]]
+    """
+    Parse a stream of raw objects into model objects.
+    
+    Args:
+        repo_path: Path to the Git repository.
+        objects: Tuples of (hash, type, size, raw_content).
+        
+    Returns:
+        Tuple of (parsed objects by type, blobs).
+    """
+    parsed = {obj_type: [] for obj_type in _PAYLOAD_PARSERS}  # type: Dict[str, list]
+    blobs = []  # type: List[GitBlob]
+    
+    for obj_hash, obj_type, obj_size, payload in objects:
+        parser = _PAYLOAD_PARSERS.get(obj_type)
+        if parser is not None:
+            parsed[obj_type].append(parser(obj_hash, payload))
+        elif obj_type == "blob":
+            blobs.append(read_blob_metadata(repo_path, obj_hash, obj_size))
+    
+    return parsed, blobs
+
+
+def _read_objects(repo, repo_path):
+    # type: (Repository, str) -> None
+    """
+    Read all objects of the repository into the Repository container.
+    
+    Args:
+        repo: Repository container to populate.
+        repo_path: Path to the Git repository.
+    """
+    # Read all objects in one pass; blobs only need their size
+    try:
+        parsed, blobs = _parse_objects(repo_path, iter_all_objects_with_contents(
+            repo_path, skip_content_types=("blob",)))
+    except CommandError:
+        # Older git versions do not support streaming all objects
+        # (--unordered); read them one by one instead
+        parsed, blobs = _parse_objects(repo_path, _iter_objects_individually(
+            repo_path, skip_content_types=("blob",)))
+    
+    # Objects arrive in pack order; sort them by hash to keep the output
+    # stable across repacks
+    by_hash = attrgetter("hash")
+    repo.extend_commits(sorted(parsed["commit"], key=by_hash))
+    repo.extend_trees(sorted(parsed["tree"], key=by_hash))
+    repo.extend_blobs(sorted(blobs, key=by_hash))
+    repo.extend_tags(sorted(parsed["tag"], key=by_hash))
 
 
 def read_repository(repo_path, include_index=True):
@@ -461,39 +975,27 @@ def read_repository(repo_path, include_index=True):
     """
     repo = Repository(repo_path)
     
-    # List all objects
-    objects = list_all_objects(repo_path)
-    
-    # Process each object based on type
-    for obj_hash, obj_type, obj_size in objects:
-        if obj_type == "commit":
-            commit = read_commit(repo_path, obj_hash)
-            repo.add_commit(commit)
-        elif obj_type == "tree":
-            tree = read_tree(repo_path, obj_hash)
-            repo.add_tree(tree)
-        elif obj_type == "blob":
-            blob = read_blob_metadata(repo_path, obj_hash, obj_size)
-            repo.add_blob(blob)
-        elif obj_type == "tag":
-            tag = read_tag(repo_path, obj_hash)
-            repo.add_tag(tag)
-    
-    # Read references
-    refs = list_references(repo_path)
-    for ref in refs:
-        repo.add_ref(ref)
-    
-    # Resolve HEAD (skip for bare repositories as HEAD is not interesting there)
-    if not is_bare_repository(repo_path):
-        head = resolve_head(repo_path)
+    # References, HEAD and the index are read by separate git commands.
+    # Run them in the background while the objects are being read; the
+    # threads mostly wait on subprocess I/O.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        refs_future = executor.submit(list_references, repo_path)
+        head_future = executor.submit(_resolve_head_unless_bare, repo_path)
+        if include_index:
+            index_future = executor.submit(read_index_entries, repo_path)
+        
+        _read_objects(repo, repo_path)
+        
+        # Read references
+        repo.extend_refs(refs_future.result())
+        
+        # Resolve HEAD
+        head = head_future.result()
         if head:
             repo.set_head(head)
-    
-    # Read index if requested
-    if include_index:
-        index_entries = read_index_entries(repo_path)
-        for entry in index_entries:
-            repo.add_index_entry(entry)
+        
+        # Read index if requested
+        if include_index:
+            repo.extend_index_entries(index_future.result())
     
     return repo
@@ -182,7 +182,8 @@ def main(args=None):
         print("Error: {}".format(error_msg), file=sys.stderr)
         return EXIT_OUTPUT_ERROR
     
-    # Check repository size
+    # Check repository size. count_objects only counts lines, so this is
+    # cheap even for repositories that are then rejected.
     try:
         object_count = count_objects(repo_path)
     except CommandError as e:
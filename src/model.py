@@ -5,12 +5,63 @@ This module defines classes representing Git objects, references, and
 repository structure. Classes are designed for Python 3.6 compatibility.
 """
 
+import bisect
+from array import array
+from collections import deque
 from enum import Enum
-from typing import Dict, List, Optional
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
 
 
-class RefType(Enum):
-    """Enumeration of Git reference types."""
+# Characters in reference names that are replaced in graph node IDs
+_REF_ID_TRANS = str.maketrans({"/": "_", ".": "_"})
+
+
+# Namespaces stripped from reference names for display
+_REF_PREFIXES = ("refs/heads/", "refs/remotes/", "refs/tags/")
+
+
+def ref_node_id(ref_name):
+    # type: (str) -> str
+    """
+    Get the graph node ID for a reference name.
+    
+    Node IDs use the full name to avoid conflicts between e.g. a local
+    branch and a tag with the same short name.
+    
+    Args:
+        ref_name: Full reference name (e.g., "refs/heads/main").
+        
+    Returns:
+        Node ID (e.g., "ref_refs_heads_main").
+    """
+    return "ref_" + ref_name.translate(_REF_ID_TRANS)
+
+
+def short_ref_name(ref_name):
+    # type: (str) -> str
+    """
+    Get the display name for a reference name.
+    
+    Args:
+        ref_name: Full reference name (e.g., "refs/heads/main").
+        
+    Returns:
+        Name without its namespace prefix (e.g., "main").
+    """
+    for prefix in _REF_PREFIXES:
+        if ref_name.startswith(prefix):
+            return ref_name[len(prefix):]
+    return ref_name
+
+
+class RefType(str, Enum):
+    """
+    Enumeration of Git reference types.
+    
+    Members are also strings, so they compare equal to their values
+    (e.g. RefType.TAG == "tag") through the str comparison.
+    """
     LOCAL_BRANCH = "local"
     REMOTE_BRANCH = "remote"
     TAG = "tag"
@@ -20,6 +71,9 @@ class RefType(Enum):
 class GitObject(object):
     """Base class for Git objects."""
     
+    # Slots avoid a per-instance __dict__; repositories hold many objects
+    __slots__ = ("_hash", "_short_hash")
+    
     def __init__(self, hash_value):
         # type: (str) -> None
         """
@@ -29,6 +83,8 @@ class GitObject(object):
             hash_value: The SHA-1 hash of the object.
         """
         self._hash = hash_value
+        # Used for every node label; computed once
+        self._short_hash = hash_value[:7] if hash_value else ""
     
     @property
     def hash(self):
@@ -40,17 +96,18 @@ class GitObject(object):
     def short_hash(self):
         # type: () -> str
         """Get the abbreviated hash (7 characters)."""
-        return self._hash[:7] if self._hash else ""
+        return self._short_hash
     
     def __repr__(self):
         # type: () -> str
-        return "{}({})".format(self.__class__.__name__, self.short_hash)
+        return "%s(%s)" % (self.__class__.__name__, self._short_hash)
     
     def __eq__(self, other):
         # type: (object) -> bool
-        if not isinstance(other, GitObject):
-            return False
-        return self._hash == other._hash
+        # Same-class comparisons (the common case) skip the isinstance check
+        if other.__class__ is self.__class__ or isinstance(other, GitObject):
+            return self._hash == other._hash
+        return NotImplemented
     
     def __hash__(self):
         # type: () -> int
@@ -60,6 +117,11 @@ class GitObject(object):
 class GitCommit(GitObject):
     """Represents a Git commit object."""
     
+    __slots__ = (
+        "tree_hash", "parent_hashes", "message", "author", "generation",
+        "_repr_message"
+    )
+    
     def __init__(self, hash_value, tree_hash, parent_hashes=None, message="", author=""):
         # type: (str, str, Optional[List[str]], str, str) -> None
         """
@@ -77,18 +139,22 @@ class GitCommit(GitObject):
         self.parent_hashes = parent_hashes if parent_hashes is not None else []
         self.message = message
         self.author = author
+        # Length of the longest path to a root commit (roots are 1); 0 until
+        # computed by Repository.compute_generations()
+        self.generation = 0
+        # Truncated message for __repr__
+        self._repr_message = message[:20] + "..." if len(message) > 20 else message
     
     def __repr__(self):
         # type: () -> str
-        return "GitCommit({}, message='{}')".format(
-            self.short_hash, 
-            self.message[:20] + "..." if len(self.message) > 20 else self.message
-        )
+        return "GitCommit(%s, message='%s')" % (self._short_hash, self._repr_message)
 
 
 class TreeEntry(object):
     """Represents an entry in a Git tree object."""
     
+    __slots__ = ("mode", "obj_type", "hash", "name")
+    
     def __init__(self, mode, obj_type, hash_value, name):
         # type: (str, str, str, str) -> None
         """
@@ -119,6 +185,8 @@ class TreeEntry(object):
 class GitTree(GitObject):
     """Represents a Git tree object."""
     
+    __slots__ = ("entries",)
+    
     def __init__(self, hash_value, entries=None):
         # type: (str, Optional[List[TreeEntry]]) -> None
         """
@@ -133,12 +201,14 @@ class GitTree(GitObject):
     
     def __repr__(self):
         # type: () -> str
-        return "GitTree({}, {} entries)".format(self.short_hash, len(self.entries))
+        return "GitTree(%s, %d entries)" % (self._short_hash, len(self.entries))
 
 
 class GitBlob(GitObject):
     """Represents a Git blob object."""
     
+    __slots__ = ("size",)
+    
     def __init__(self, hash_value, size=0):
         # type: (str, int) -> None
         """
@@ -153,12 +223,14 @@ class GitBlob(GitObject):
     
     def __repr__(self):
         # type: () -> str
-        return "GitBlob({}, {} bytes)".format(self.short_hash, self.size)
+        return "GitBlob(%s, %s bytes)" % (self._short_hash, self.size)
 
 
 class GitTag(GitObject):
     """Represents a Git annotated tag object."""
     
+    __slots__ = ("target_hash", "name", "message", "tagger")
+    
     def __init__(self, hash_value, target_hash, name="", message="", tagger=""):
         # type: (str, str, str, str, str) -> None
         """
@@ -179,12 +251,17 @@ class GitTag(GitObject):
     
     def __repr__(self):
         # type: () -> str
-        return "GitTag({}, name='{}')".format(self.short_hash, self.name)
+        return "GitTag(%s, name='%s')" % (self._short_hash, self.name)
 
 
 class GitRef(object):
     """Represents a Git reference (branch, tag ref, or HEAD)."""
     
+    __slots__ = (
+        "name", "target_hash", "ref_type", "upstream",
+        "node_id", "upstream_node_id", "_short_hash", "_short_name"
+    )
+    
     def __init__(self, name, target_hash, ref_type, upstream=None):
         # type: (str, str, RefType, Optional[str]) -> None
         """
@@ -200,30 +277,28 @@ class GitRef(object):
         self.target_hash = target_hash
         self.ref_type = ref_type
         self.upstream = upstream
+        
+        # Graph node IDs, derived once as they are needed in several places
+        self.node_id = ref_node_id(name)
+        self.upstream_node_id = ref_node_id(upstream) if upstream else None
+        self._short_hash = target_hash[:7] if target_hash else ""
+        self._short_name = short_ref_name(name)
     
     @property
     def short_name(self):
         # type: () -> str
         """Get the short reference name (without refs/heads/, refs/remotes/, etc.)."""
-        prefixes = [
-            "refs/heads/",
-            "refs/remotes/",
-            "refs/tags/",
-        ]
-        for prefix in prefixes:
-            if self.name.startswith(prefix):
-                return self.name[len(prefix):]
-        return self.name
+        return self._short_name
     
     @property
     def short_hash(self):
         # type: () -> str
         """Get the abbreviated target hash (7 characters)."""
-        return self.target_hash[:7] if self.target_hash else ""
+        return self._short_hash
     
     def __repr__(self):
         # type: () -> str
-        return "GitRef({} -> {})".format(self.name, self.short_hash)
+        return "GitRef(%s -> %s)" % (self.name, self._short_hash)
     
     def __eq__(self, other):
         # type: (object) -> bool
@@ -239,6 +314,8 @@ class GitRef(object):
 class IndexEntry(object):
     """Represents an entry in the Git index (staging area)."""
     
+    __slots__ = ("hash", "path", "stage", "_short_hash")
+    
     def __init__(self, hash_value, path, stage=0):
         # type: (str, str, int) -> None
         """
@@ -252,18 +329,82 @@ class IndexEntry(object):
         self.hash = hash_value
         self.path = path
         self.stage = stage
+        self._short_hash = hash_value[:7] if hash_value else ""
     
     @property
     def short_hash(self):
         # type: () -> str
         """Get the abbreviated hash (7 characters)."""
-        return self.hash[:7] if self.hash else ""
+        return self._short_hash
     
     def __repr__(self):
         # type: () -> str
         return "IndexEntry({} {})".format(self.short_hash, self.path)
 
 
+class CommitTable(object):
+    """
+    Structure-of-arrays view of the commits of a repository.
+    
+    The commit graph is stored in CSR (compressed sparse row) layout: the
+    parents of commit i are parents[parent_offsets[i]:parent_offsets[i + 1]],
+    given as commit indices. Graph walks can thus work on integer indices
+    instead of following hash strings through dict lookups.
+    """
+    
+    __slots__ = ("hashes", "tree_hashes", "parent_offsets", "parents", "_index")
+    
+    def __init__(self, commits):
+        # type: (List[GitCommit]) -> None
+        """
+        Build the table.
+        
+        Args:
+            commits: The commits, in the order of their indices.
+        """
+        self.hashes = [commit.hash for commit in commits]  # type: List[str]
+        self.tree_hashes = [commit.tree_hash for commit in commits]  # type: List[str]
+        self._index = {h: i for i, h in enumerate(self.hashes)}  # type: Dict[str, int]
+        
+        index = self._index
+        self.parent_offsets = array("l", [0])
+        self.parents = array("l")
+        for commit in commits:
+            # Parents outside the repository (e.g. shallow clones) are -1
+            self.parents.extend(index.get(h, -1) for h in commit.parent_hashes)
+            self.parent_offsets.append(len(self.parents))
+    
+    def __len__(self):
+        # type: () -> int
+        return len(self.hashes)
+    
+    def index_of(self, hash_value):
+        # type: (str) -> int
+        """
+        Get the index of a commit.
+        
+        Args:
+            hash_value: Full hash of the commit.
+            
+        Returns:
+            Index of the commit, or -1 if it is not in the table.
+        """
+        return self._index.get(hash_value, -1)
+    
+    def parents_of(self, index):
+        # type: (int) -> array
+        """
+        Get the parent indices of a commit.
+        
+        Args:
+            index: Index of the commit.
+            
+        Returns:
+            Indices of the parents (-1 for parents not in the table).
+        """
+        return self.parents[self.parent_offsets[index]:self.parent_offsets[index + 1]]
+
+
 class Repository(object):
     """Container for all Git repository data."""
     
@@ -276,55 +417,208 @@ class Repository(object):
             path: Path to the Git repository.
         """
         self.path = path
-        self.commits = []  # type: List[GitCommit]
-        self.trees = []  # type: List[GitTree]
-        self.blobs = []  # type: List[GitBlob]
-        self.tags = []  # type: List[GitTag]
+        # Objects by their class, in insertion order
+        self._by_type = {
+            GitCommit: [],
+            GitTree: [],
+            GitBlob: [],
+            GitTag: [],
+        }  # type: Dict[type, List[GitObject]]
         self.refs = []  # type: List[GitRef]
         self.index_entries = []  # type: List[IndexEntry]
         self.head = None  # type: Optional[GitRef]
         
         # Internal lookup table for objects by hash
         self._objects_by_hash = {}  # type: Dict[str, GitObject]
+        # Sorted hashes for abbreviated lookups; built on demand and
+        # reset whenever objects are added
+        self._sorted_hashes = None  # type: Optional[List[str]]
+        # Number of objects added through add_*/extend_*
+        self._object_count = 0
+        # Built on demand and reset whenever commits are added
+        self._commit_table = None  # type: Optional[CommitTable]
+        self._children_index = None  # type: Optional[Dict[str, List[str]]]
+        # Canonical instance of each hash string. The same hash is parsed
+        # many times (parents, tree entries, refs); keeping one copy saves
+        # memory and lets comparisons succeed on identity.
+        self._hash_intern = {}  # type: Dict[str, str]
+    
+    def _intern(self, hash_value):
+        # type: (str) -> str
+        """Get the canonical instance of a hash string."""
+        return self._hash_intern.setdefault(hash_value, hash_value)
+    
+    def _intern_commit(self, commit):
+        # type: (GitCommit) -> GitCommit
+        """Replace the hashes of a commit by their canonical instances."""
+        intern = self._intern
+        commit._hash = intern(commit._hash)
+        commit.tree_hash = intern(commit.tree_hash)
+        commit.parent_hashes[:] = [intern(h) for h in commit.parent_hashes]
+        return commit
+    
+    def _intern_tree(self, tree):
+        # type: (GitTree) -> GitTree
+        """Replace the hashes of a tree and its entries by canonical instances."""
+        intern = self._intern
+        tree._hash = intern(tree._hash)
+        for entry in tree.entries:
+            entry.hash = intern(entry.hash)
+        return tree
+    
+    def _intern_blob(self, blob):
+        # type: (GitBlob) -> GitBlob
+        """Replace the hash of a blob by its canonical instance."""
+        blob._hash = self._intern(blob._hash)
+        return blob
+    
+    def _intern_tag(self, tag):
+        # type: (GitTag) -> GitTag
+        """Replace the hashes of a tag object by their canonical instances."""
+        tag._hash = self._intern(tag._hash)
+        tag.target_hash = self._intern(tag.target_hash)
+        return tag
+    
+    def _intern_ref(self, ref):
+        # type: (GitRef) -> GitRef
+        """Replace the target hash of a reference by its canonical instance."""
+        ref.target_hash = self._intern(ref.target_hash)
+        return ref
+    
+    def _intern_index_entry(self, entry):
+        # type: (IndexEntry) -> IndexEntry
+        """Replace the hash of an index entry by its canonical instance."""
+        entry.hash = self._intern(entry.hash)
+        return entry
+    
+    # Interning functions by object class
+    _OBJECT_INTERNERS = {
+        GitCommit: _intern_commit,
+        GitTree: _intern_tree,
+        GitBlob: _intern_blob,
+        GitTag: _intern_tag,
+    }
+    
+    @property
+    def commits(self):
+        # type: () -> List[GitCommit]
+        """Get the commits of the repository."""
+        return self._by_type[GitCommit]
+    
+    @property
+    def trees(self):
+        # type: () -> List[GitTree]
+        """Get the trees of the repository."""
+        return self._by_type[GitTree]
+    
+    @property
+    def blobs(self):
+        # type: () -> List[GitBlob]
+        """Get the blobs of the repository."""
+        return self._by_type[GitBlob]
+    
+    @property
+    def tags(self):
+        # type: () -> List[GitTag]
+        """Get the annotated tag objects of the repository."""
+        return self._by_type[GitTag]
+    
+    def add(self, obj):
+        # type: (GitObject) -> None
+        """
+        Add an object (commit, tree, blob or tag) to the repository.
+        
+        Args:
+            obj: The object to add.
+        """
+        cls = obj.__class__
+        self._by_type[cls].append(self._OBJECT_INTERNERS[cls](self, obj))
+        self._objects_by_hash[obj.hash] = obj
+        self._object_added(cls, 1)
+    
+    def _object_added(self, cls, count):
+        # type: (type, int) -> None
+        """Update the counters and reset the derived data after adding objects."""
+        self._object_count += count
+        self._sorted_hashes = None
+        if cls is GitCommit:
+            self._commit_table = None
+            self._children_index = None
     
     def add_commit(self, commit):
         # type: (GitCommit) -> None
         """Add a commit to the repository."""
-        self.commits.append(commit)
-        self._objects_by_hash[commit.hash] = commit
+        self.add(commit)
     
     def add_tree(self, tree):
         # type: (GitTree) -> None
         """Add a tree to the repository."""
-        self.trees.append(tree)
-        self._objects_by_hash[tree.hash] = tree
+        self.add(tree)
     
     def add_blob(self, blob):
         # type: (GitBlob) -> None
         """Add a blob to the repository."""
-        self.blobs.append(blob)
-        self._objects_by_hash[blob.hash] = blob
+        self.add(blob)
     
     def add_tag(self, tag):
         # type: (GitTag) -> None
         """Add a tag object to the repository."""
-        self.tags.append(tag)
-        self._objects_by_hash[tag.hash] = tag
+        self.add(tag)
     
     def add_ref(self, ref):
         # type: (GitRef) -> None
         """Add a reference to the repository."""
-        self.refs.append(ref)
+        self.refs.append(self._intern_ref(ref))
     
     def add_index_entry(self, entry):
         # type: (IndexEntry) -> None
         """Add an index entry to the repository."""
-        self.index_entries.append(entry)
+        self.index_entries.append(self._intern_index_entry(entry))
+    
+    def _extend_objects(self, cls, objects):
+        # type: (type, Iterable[GitObject]) -> None
+        """Append objects of one class and register them by hash."""
+        target = self._by_type[cls]
+        intern = self._OBJECT_INTERNERS[cls]
+        start = len(target)
+        target.extend(intern(self, obj) for obj in objects)
+        self._objects_by_hash.update((obj.hash, obj) for obj in target[start:])
+        self._object_added(cls, len(target) - start)
+    
+    def extend_commits(self, commits):
+        # type: (Iterable[GitCommit]) -> None
+        """Add several commits to the repository."""
+        self._extend_objects(GitCommit, commits)
+    
+    def extend_trees(self, trees):
+        # type: (Iterable[GitTree]) -> None
+        """Add several trees to the repository."""
+        self._extend_objects(GitTree, trees)
+    
+    def extend_blobs(self, blobs):
+        # type: (Iterable[GitBlob]) -> None
+        """Add several blobs to the repository."""
+        self._extend_objects(GitBlob, blobs)
+    
+    def extend_tags(self, tags):
+        # type: (Iterable[GitTag]) -> None
+        """Add several tag objects to the repository."""
+        self._extend_objects(GitTag, tags)
+    
+    def extend_refs(self, refs):
+        # type: (Iterable[GitRef]) -> None
+        """Add several references to the repository."""
+        self.refs.extend(map(self._intern_ref, refs))
+    
+    def extend_index_entries(self, entries):
+        # type: (Iterable[IndexEntry]) -> None
+        """Add several index entries to the repository."""
+        self.index_entries.extend(map(self._intern_index_entry, entries))
     
     def set_head(self, head_ref):
         # type: (GitRef) -> None
         """Set the HEAD reference."""
-        self.head = head_ref
+        self.head = self._intern_ref(head_ref)
     
     def get_object_by_hash(self, hash_value):
         # type: (str) -> Optional[GitObject]
@@ -335,35 +629,119 @@ class Repository(object):
             hash_value: The full or partial hash.
             
         Returns:
-            The GitObject, or None if not found.
+            The GitObject, or None if not found or if an abbreviated hash
+            is ambiguous.
         """
         # Try exact match first
-        if hash_value in self._objects_by_hash:
-            return self._objects_by_hash[hash_value]
-        
-        # Try prefix match (for abbreviated hashes)
-        for full_hash, obj in self._objects_by_hash.items():
-            if full_hash.startswith(hash_value):
-                return obj
+        obj = self._objects_by_hash.get(hash_value)
+        if obj is not None or not hash_value:
+            return obj
         
-        return None
+        # Try prefix match (for abbreviated hashes). Matching hashes are
+        # adjacent in sorted order, starting at the bisection point.
+        if self._sorted_hashes is None:
+            self._sorted_hashes = sorted(self._objects_by_hash)
+        hashes = self._sorted_hashes
+        i = bisect.bisect_left(hashes, hash_value)
+        if i == len(hashes) or not hashes[i].startswith(hash_value):
+            return None
+        if i + 1 < len(hashes) and hashes[i + 1].startswith(hash_value):
+            # Ambiguous, like git's abbreviated object names
+            return None
+        return self._objects_by_hash[hashes[i]]
     
     @property
     def object_count(self):
         # type: () -> int
         """Get the total number of objects in the repository."""
-        return len(self.commits) + len(self.trees) + len(self.blobs) + len(self.tags)
+        return self._object_count
+    
+    @property
+    def commit_table(self):
+        # type: () -> CommitTable
+        """Get the commits as a CommitTable, with indices in commit order."""
+        if self._commit_table is None:
+            self._commit_table = CommitTable(self.commits)
+        return self._commit_table
+    
+    def build_children_index(self):
+        # type: () -> None
+        """
+        Build the reverse index from commits to their children.
+        
+        Called on demand by children_of(); the index is reset whenever
+        commits are added.
+        """
+        index = {}  # type: Dict[str, List[str]]
+        for commit in self.commits:
+            for parent_hash in commit.parent_hashes:
+                index.setdefault(parent_hash, []).append(commit.hash)
+        self._children_index = index
+    
+    def children_of(self, hash_value):
+        # type: (str) -> Sequence[str]
+        """
+        Get the children of a commit.
+        
+        Args:
+            hash_value: Full hash of the commit.
+            
+        Returns:
+            Hashes of the commits that have the commit as a parent.
+        """
+        if self._children_index is None:
+            self.build_children_index()
+        return self._children_index.get(hash_value, ())
+    
+    def compute_generations(self):
+        # type: () -> None
+        """
+        Compute the generation numbers of all commits.
+        
+        A commit's generation is one more than the largest generation of its
+        parents, with root commits at 1 (parents missing from the repository
+        are ignored). As in git's commit-graph, a commit can never be
+        reachable from a commit of lower or equal generation, which lets
+        graph walks stop early.
+        
+        Commits are visited in topological order (Kahn's algorithm), so the
+        cost is linear in the number of commits and parent links.
+        """
+        table = self.commit_table
+        count = len(table)
+        children = [[] for _ in range(count)]  # type: List[List[int]]
+        pending = [0] * count
+        for i in range(count):
+            for parent in table.parents_of(i):
+                if parent >= 0:
+                    children[parent].append(i)
+                    pending[i] += 1
+        
+        generations = [1] * count
+        queue = deque(i for i in range(count) if not pending[i])
+        while queue:
+            i = queue.popleft()
+            child_generation = generations[i] + 1
+            for child in children[i]:
+                if generations[child] < child_generation:
+                    generations[child] = child_generation
+                pending[child] -= 1
+                if not pending[child]:
+                    queue.append(child)
+        
+        for commit, generation in zip(self.commits, generations):
+            commit.generation = generation
+    
+    def iter_objects(self):
+        # type: () -> Iterator[GitObject]
+        """Iterate over all objects in the repository without copying them."""
+        return chain.from_iterable(self._by_type.values())
     
     @property
     def all_objects(self):
         # type: () -> List[GitObject]
-        """Get all objects in the repository."""
-        result = []  # type: List[GitObject]
-        result.extend(self.commits)
-        result.extend(self.trees)
-        result.extend(self.blobs)
-        result.extend(self.tags)
-        return result
+        """Get all objects in the repository as a new list."""
+        return list(self.iter_objects())
     
     def __repr__(self):
         # type: () -> str
@@ -5,11 +5,7 @@ This module invokes the Graphviz dot command to render DOT source
 into various output formats (SVG, PNG, PDF).
 """
 
-import subprocess
-import tempfile
-import os
-
-from typing import Optional
+from typing import List, Optional
 
 from .utils import run_command, get_output_format, CommandError
 
@@ -24,6 +20,46 @@ class RenderError(Exception):
         super(RenderError, self).__init__(message)
 
 
+def _run_dot(options, dot_source):
+    # type: (List[str], str) -> bytes
+    """
+    Run the Graphviz dot command with the DOT source on its stdin.
+    
+    No temporary files are involved; the source and the output stay in
+    pipes.
+    
+    Args:
+        options: Options for dot.
+        dot_source: DOT language source string.
+        
+    Returns:
+        Standard output of dot.
+        
+    Raises:
+        RenderError: If rendering fails.
+    """
+    try:
+        returncode, stdout, stderr = run_command(
+            ["dot"] + options,
+            check=False,
+            binary=True,
+            input_data=dot_source.encode("utf-8")
+        )
+    except CommandError as e:
+        raise RenderError(
+            "Failed to execute Graphviz dot command",
+            details=str(e)
+        )
+    
+    if returncode != 0:
+        raise RenderError(
+            "Graphviz dot command failed",
+            details=stderr.decode("utf-8", "replace")
+        )
+    
+    return stdout
+
+
 def render_dot_to_file(dot_source, output_path):
     # type: (str, str) -> None
     """
@@ -41,40 +77,34 @@ def render_dot_to_file(dot_source, output_path):
     # Determine output format from extension
     output_format = get_output_format(output_path)
     
-    # Create a temporary file for the DOT source
-    # Using delete=False so we can pass the filename to dot
-    fd, temp_dot_path = tempfile.mkstemp(suffix=".dot")
-    try:
-        # Write DOT source to temp file
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            f.write(dot_source)
+    # Invoke Graphviz dot command, piping the DOT source to its stdin
+    # dot -T<format> -o <output>
+    _run_dot(["-T{}".format(output_format), "-o", output_path], dot_source)
+
+
+def render_many(dot_source, output_paths):
+    # type: (str, List[str]) -> None
+    """
+    Render DOT source to several output files in one pass.
+    
+    The output formats are determined by the file extensions. A single dot
+    process is given one -T/-o pair per file, so the source is parsed and
+    laid out only once and just the final output stage is repeated.
+    
+    Args:
+        dot_source: DOT language source string.
+        output_paths: Paths to the output files.
         
-        # Invoke Graphviz dot command
-        # dot -T<format> -o <output> <input>
-        try:
-            returncode, stdout, stderr = run_command(
-                ["dot", "-T{}".format(output_format), "-o", output_path, temp_dot_path],
-                check=False
-            )
-            
-            if returncode != 0:
-                raise RenderError(
-                    "Graphviz dot command failed",
-                    details=stderr
-                )
-                
-        except CommandError as e:
-            raise RenderError(
-                "Failed to execute Graphviz dot command",
-                details=str(e)
-            )
-            
-    finally:
-        # Clean up temporary file
-        try:
-            os.unlink(temp_dot_path)
-        except OSError:
-            pass
+    Raises:
+        RenderError: If rendering fails.
+    """
+    if not output_paths:
+        return
+    
+    options = []  # type: List[str]
+    for output_path in output_paths:
+        options += ["-T{}".format(get_output_format(output_path)), "-o", output_path]
+    _run_dot(options, dot_source)
 
 
 def render_dot_to_string(dot_source, output_format="svg"):
@@ -94,48 +124,45 @@ def render_dot_to_string(dot_source, output_format="svg"):
     Raises:
         RenderError: If rendering fails.
     """
-    # Create temporary files
-    fd_in, temp_dot_path = tempfile.mkstemp(suffix=".dot")
-    fd_out, temp_out_path = tempfile.mkstemp(suffix=".{}".format(output_format))
+    # Pipe the DOT source in and read the result from stdout
+    output = _run_dot(["-T{}".format(output_format)], dot_source)
+    return output.decode("utf-8")
+
+
+def render_dots_to_svg(dot_sources):
+    # type: (List[str]) -> List[str]
+    """
+    Render several DOT sources to SVG with a single dot process.
     
-    try:
-        # Close the output fd, we'll use the path
-        os.close(fd_out)
+    Starting dot (and loading its plugins) is a fixed cost that dominates
+    the rendering of small graphs. dot renders all graphs of its input in
+    turn, so the sources are concatenated and the SVG documents are split
+    apart again afterwards.
+    
+    Args:
+        dot_sources: DOT language source strings, one graph each.
         
-        # Write DOT source to temp file
-        with os.fdopen(fd_in, "w", encoding="utf-8") as f:
-            f.write(dot_source)
+    Returns:
+        Rendered SVG documents, in the order of the sources.
         
-        # Invoke Graphviz dot command
-        try:
-            returncode, stdout, stderr = run_command(
-                ["dot", "-T{}".format(output_format), "-o", temp_out_path, temp_dot_path],
-                check=False
-            )
-            
-            if returncode != 0:
-                raise RenderError(
-                    "Graphviz dot command failed",
-                    details=stderr
-                )
-            
-            # Read the output
-            with open(temp_out_path, "r", encoding="utf-8") as f:
-                return f.read()
-                
-        except CommandError as e:
-            raise RenderError(
-                "Failed to execute Graphviz dot command",
-                details=str(e)
+    Raises:
+        RenderError: If rendering fails.
+    """
+    if not dot_sources:
+        return []
+    
+    output = _run_dot(["-Tsvg"], "\n".join(dot_sources)).decode("utf-8")
+    
+    # Each document ends with its closing svg tag
+    end_tag = "</svg>\n"
+    documents = [doc + end_tag for doc in output.split(end_tag)[:-1]]
+    if len(documents) != len(dot_sources):
+        raise RenderError(
+            "Graphviz dot command returned {} documents for {} graphs".format(
+                len(documents), len(dot_sources)
             )
-            
-    finally:
-        # Clean up temporary files
-        for path in [temp_dot_path, temp_out_path]:
-            try:
-                os.unlink(path)
-            except OSError:
-                pass
+        )
+    return documents
 
 
 def get_supported_formats():
@@ -7,12 +7,14 @@ and external tool validation.
 
 from __future__ import print_function
 
+import functools
 import os
 import subprocess
 import sys
+import threading
 
 # Type hints compatible with Python 3.6
-from typing import Optional, Tuple, List
+from typing import Any, Optional, Tuple, List
 
 
 class CommandError(Exception):
@@ -35,17 +37,36 @@ def normalize_path(path):
     """
     Normalize a path for cross-platform compatibility.
     
+    Results for absolute paths are cached. Relative paths depend on the
+    current working directory and are resolved on every call.
+    
     Args:
         path: The path to normalize.
         
     Returns:
         The normalized absolute path.
     """
+    if os.path.isabs(path):
+        return _normalize_absolute_path(path)
     return os.path.normpath(os.path.abspath(path))
 
 
-def run_command(args, cwd=None, check=True):
-    # type: (List[str], Optional[str], bool) -> Tuple[int, str, str]
+@functools.lru_cache(maxsize=1024)
+def _normalize_absolute_path(path):
+    # type: (str) -> str
+    """Cached normalization of an absolute path."""
+    return os.path.normpath(path)
+
+
+# On POSIX, descriptors opened by Python are non-inheritable (PEP 446), so
+# the costly closing of all descriptors in the child can be skipped. On
+# Windows close_fds=False would let children inherit all inheritable
+# handles, including the pipes of concurrently running git processes.
+_SPAWN_OPTIONS = {"close_fds": False} if os.name == "posix" else {}
+
+
+def run_command(args, cwd=None, check=True, binary=False, input_data=None):
+    # type: (List[str], Optional[str], bool, bool, Any) -> Tuple[int, Any, Any]
     """
     Execute a command and return its output.
     
@@ -53,6 +74,10 @@ def run_command(args, cwd=None, check=True):
         args: Command and arguments as a list.
         cwd: Working directory for the command.
         check: If True, raise CommandError on non-zero exit code.
+        binary: If True, return stdout and stderr as undecoded bytes. This
+            avoids decoding large outputs of which only parts are needed.
+        input_data: Data to pipe to the standard input of the command
+            (bytes if binary is True, str otherwise).
         
     Returns:
         Tuple of (returncode, stdout, stderr).
@@ -61,20 +86,26 @@ def run_command(args, cwd=None, check=True):
         CommandError: If check is True and command returns non-zero exit code.
     """
     try:
-        # Use subprocess.PIPE for capturing output
-        # shell=False for security
-        process = subprocess.Popen(
+        # Use subprocess.PIPE for capturing output (capture_output needs
+        # Python 3.7); shell=False for security
+        result = subprocess.run(
             args,
+            input=input_data,
+            # Spare the stdin pipe unless there is input to feed
+            stdin=subprocess.DEVNULL if input_data is None else None,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             cwd=cwd,
-            # Ensure text mode output on Python 3
-            universal_newlines=True
+            # Text mode output on Python 3 unless raw bytes are requested
+            universal_newlines=not binary,
+            **_SPAWN_OPTIONS
         )
-        stdout, stderr = process.communicate()
-        returncode = process.returncode
+        stdout, stderr = result.stdout, result.stderr
+        returncode = result.returncode
         
         if check and returncode != 0:
+            if binary:
+                stderr = stderr.decode("utf-8", "replace")
             raise CommandError(" ".join(args), returncode, stderr)
             
         return returncode, stdout, stderr
@@ -84,17 +115,163 @@ def run_command(args, cwd=None, check=True):
         raise CommandError(" ".join(args), -1, str(e))
 
 
+def parse_cat_file_header(command, header):
+    # type: (str, bytes) -> Tuple[str, str, int]
+    """
+    Parse an object header line of git cat-file --batch output.
+    
+    Args:
+        command: The cat-file command, for error messages.
+        header: The header line, "<hash> <type> <size>" for found objects
+            or "<name> missing" / "<name> ambiguous" otherwise.
+        
+    Returns:
+        Tuple of (hash, type, size).
+        
+    Raises:
+        CommandError: If the object was not found or the header is invalid.
+    """
+    line = header.rstrip(b"\n")
+    # Check the status first: the requested name may contain spaces
+    name, _, status = line.rpartition(b" ")
+    if status in (b"missing", b"ambiguous"):
+        raise CommandError(
+            command, 128,
+            "fatal: Not a valid object name {}".format(name.decode("utf-8", "replace"))
+        )
+    parts = line.split(b" ")
+    if len(parts) != 3 or not parts[2].isdigit():
+        raise CommandError(
+            command, 128,
+            "fatal: Unexpected cat-file output {!r}".format(line)
+        )
+    return parts[0].decode("ascii"), parts[1].decode("ascii"), int(parts[2])
+
+
+class GitCatFileSession(object):
+    """
+    Persistent git cat-file --batch process.
+    
+    Objects are requested over stdin and read back from stdout, so reading
+    any number of objects costs a single fork (and a single load of the
+    pack indexes). Requests are serialized, so a session can be shared
+    between threads.
+    
+    Usage:
+        with GitCatFileSession(repo_path) as session:
+            obj_type, size, content = session.read(obj_hash)
+    """
+    
+    def __init__(self, cwd):
+        # type: (str) -> None
+        """
+        Start the git process.
+        
+        Args:
+            cwd: Path to the Git repository.
+            
+        Raises:
+            CommandError: If git cannot be started.
+        """
+        args = ["git", "cat-file", "--batch"]
+        self._command = " ".join(args)
+        try:
+            self._process = subprocess.Popen(
+                args,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=cwd
+            )
+        except OSError as e:
+            raise CommandError(self._command, -1, str(e))
+        self._lock = threading.Lock()
+        # Error output of git once the process has exited or was closed
+        self._closed_reason = None  # type: Optional[str]
+    
+    def read(self, obj_hash):
+        # type: (str) -> Tuple[str, int, bytes]
+        """
+        Read an object.
+        
+        Args:
+            obj_hash: Hash (or other object name) of the object.
+            
+        Returns:
+            Tuple of (type, size, raw_content).
+            
+        Raises:
+            CommandError: If the object is missing or git has exited.
+        """
+        with self._lock:
+            process = self._process
+            if self._closed_reason is not None:
+                raise CommandError(
+                    self._command, process.returncode, self._closed_reason
+                )
+            try:
+                process.stdin.write(obj_hash.encode("utf-8") + b"\n")
+                process.stdin.flush()
+            except (OSError, ValueError):
+                # git exited; the error is reported below
+                pass
+            
+            header = process.stdout.readline()
+            if not header:
+                stderr = process.stderr.read().decode("utf-8", "replace")
+                self.close()
+                self._closed_reason = stderr or "git exited"
+                raise CommandError(self._command, process.returncode, stderr)
+            
+            _, obj_type, size = parse_cat_file_header(self._command, header)
+            # Content is followed by a newline
+            content = process.stdout.read(size + 1)[:-1]
+            return obj_type, size, content
+    
+    def close(self):
+        # type: () -> None
+        """Stop the git process."""
+        if self._closed_reason is None:
+            self._closed_reason = "session is closed"
+        process = self._process
+        if not process.stdin.closed:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+        process.wait()
+        process.stdout.close()
+        process.stderr.close()
+    
+    def __enter__(self):
+        # type: () -> GitCatFileSession
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        # type: (object, object, object) -> None
+        self.close()
+
+
 def is_git_repository(path):
     # type: (str) -> bool
     """
     Check if the given path is inside a Git repository.
     
+    The result is cached per normalized path.
+    
     Args:
         path: Path to check.
         
     Returns:
         True if the path is inside a Git repository, False otherwise.
     """
+    return _is_git_repository(normalize_path(path))
+
+
+@functools.lru_cache(maxsize=128)
+def _is_git_repository(path):
+    # type: (str) -> bool
+    """Uncached implementation of is_git_repository for a normalized path."""
     try:
         returncode, stdout, stderr = run_command(
             ["git", "rev-parse", "--git-dir"],
@@ -111,12 +288,21 @@ def is_bare_repository(path):
     """
     Check if the given path is a bare Git repository.
     
+    The result is cached per normalized path.
+    
     Args:
         path: Path to check.
         
     Returns:
         True if the repository is bare, False otherwise.
     """
+    return _is_bare_repository(normalize_path(path))
+
+
+@functools.lru_cache(maxsize=128)
+def _is_bare_repository(path):
+    # type: (str) -> bool
+    """Uncached implementation of is_bare_repository for a normalized path."""
     try:
         returncode, stdout, stderr = run_command(
             ["git", "rev-parse", "--is-bare-repository"],
@@ -133,12 +319,21 @@ def get_git_dir(path):
     """
     Get the .git directory for a repository.
     
+    The result is cached per normalized path.
+    
     Args:
         path: Path to the repository.
         
     Returns:
         Absolute path to the .git directory, or None if not a repository.
     """
+    return _get_git_dir(normalize_path(path))
+
+
+@functools.lru_cache(maxsize=128)
+def _get_git_dir(path):
+    # type: (str) -> Optional[str]
+    """Uncached implementation of get_git_dir for a normalized path."""
     try:
         returncode, stdout, stderr = run_command(
             ["git", "rev-parse", "--git-dir"],
@@ -156,11 +351,15 @@ def get_git_dir(path):
         return None
 
 
+@functools.lru_cache(maxsize=1)
 def check_git_available():
     # type: () -> Tuple[bool, str]
     """
     Check if git CLI is available.
     
+    The result is cached for the lifetime of the process, so changes to
+    PATH after the first call are not picked up.
+    
     Returns:
         Tuple of (available, version_or_error_message).
     """
@@ -176,11 +375,15 @@ def check_git_available():
         return False, str(e)
 
 
+@functools.lru_cache(maxsize=1)
 def check_graphviz_available():
     # type: () -> Tuple[bool, str]
     """
     Check if Graphviz dot command is available.
     
+    The result is cached for the lifetime of the process, so changes to
+    PATH after the first call are not picked up.
+    
     Returns:
         Tuple of (available, version_or_error_message).
     """
@@ -191,7 +394,7 @@ def check_graphviz_available():
         )
         # dot -V outputs to stderr, not stdout
         if returncode == 0:
-            version = stderr.strip() if stderr.strip() else stdout.strip()
+            version = stderr.strip() or stdout.strip()
             return True, version
         return False, "dot command returned error"
     except CommandError as e:
@@ -217,21 +420,34 @@ def validate_output_path(path):
     if not directory:
         directory = "."
     
-    # Check if directory exists
-    if not os.path.exists(directory):
-        return False, "Directory '{}' does not exist".format(directory)
-    
-    # Check if directory is writable
+    # Check if directory is writable; only find out why on failure
     if not os.access(directory, os.W_OK):
+        if not os.path.exists(directory):
+            return False, "Directory '{}' does not exist".format(directory)
         return False, "Directory '{}' is not writable".format(directory)
     
     # If file exists, check if it's writable
-    if os.path.exists(path) and not os.access(path, os.W_OK):
+    try:
+        os.stat(path)
+    except FileNotFoundError:
+        return True, ""
+    except OSError:
+        # Reported by the access check below
+        pass
+    if not os.access(path, os.W_OK):
         return False, "File '{}' is not writable".format(path)
     
     return True, ""
 
 
+# Output formats by file extension
+_FORMAT_MAP = {
+    "svg": "svg",
+    "png": "png",
+    "pdf": "pdf",
+}
+
+
 def get_output_format(path):
     # type: (str) -> str
     """
@@ -243,16 +459,10 @@ def get_output_format(path):
     Returns:
         Format string: 'svg', 'png', or 'pdf'. Defaults to 'svg'.
     """
-    _, ext = os.path.splitext(path)
-    ext = ext.lower()
-    
-    format_map = {
-        ".svg": "svg",
-        ".png": "png",
-        ".pdf": "pdf",
-    }
-    
-    return format_map.get(ext, "svg")
+    _, sep, ext = path.rpartition(".")
+    if not sep:
+        return "svg"
+    return _FORMAT_MAP.get(ext.lower(), "svg")
 
 
 def abbreviate_hash(hash_str, length=7):